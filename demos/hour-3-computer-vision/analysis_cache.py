@@ -0,0 +1,150 @@
+"""
+Content-Addressed Result Cache for the Document Intelligence Demo
+=================================================================
+
+Re-running the demo re-uploads and re-analyzes the same files. This
+cache stores each AnalyzeResult on disk under the SHA-256 of the file
+bytes and the model that analyzed it:
+
+    <directory>/<model_id>/<sha256>.json
+
+so a repeat run (or the same invoice under another name) is answered
+from disk, while a changed file or a different model is a miss.
+
+Date and time field values (InvoiceDate, DueDate, TransactionTime, ...)
+are stored as ISO-format strings and parsed back on load, so a cached
+result carries the same value types as a live one.
+
+Entries are written atomically (temp file + rename), and the directory
+is kept under max_bytes by evicting the least recently used entries
+(file modification time, refreshed on every hit).
+
+Prerequisites:
+    pip install azure-ai-formrecognizer
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from azure.ai.formrecognizer import AnalyzeResult
+
+
+def document_key(document: bytes) -> str:
+    """SHA-256 of the document bytes."""
+    return hashlib.sha256(document).hexdigest()
+
+
+# DocumentField value types that JSON can't hold, and how to read them back
+TEMPORAL_TYPES = {"date": datetime.date.fromisoformat, "time": datetime.time.fromisoformat}
+
+
+def _to_json(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot store {type(value).__name__} in the analysis cache")
+
+
+def _restore_temporal(data):
+    """Parse the ISO strings of date/time DocumentFields (in place, at any depth)."""
+    if isinstance(data, list):
+        for item in data:
+            _restore_temporal(item)
+    elif isinstance(data, dict):
+        parse = TEMPORAL_TYPES.get(data.get("value_type"))
+        if parse is not None and isinstance(data.get("value"), str):
+            data["value"] = parse(data["value"])
+        for item in data.values():
+            if isinstance(item, (dict, list)):
+                _restore_temporal(item)
+    return data
+
+
+class AnalysisCache:
+    """
+    Disk cache of AnalyzeResults keyed by (model_id, SHA-256 of the bytes).
+
+    Args:
+        directory: Where entries are stored (created if missing)
+        max_bytes: Total size kept before least recently used entries are evicted
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {}  # path -> bytes, for eviction without re-scanning
+        for root, _, names in os.walk(directory):
+            for name in names:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    self._sizes[path] = os.path.getsize(path)
+
+    def _path(self, model_id: str, key: str) -> str:
+        return os.path.join(self.directory, model_id, f"{key}.json")
+
+    def get(self, model_id: str, document: bytes) -> Optional[AnalyzeResult]:
+        """The cached result for this document and model, or None (counted as a miss)."""
+        path = self._path(model_id, document_key(document))
+        try:
+            with open(path, encoding="utf-8") as f:
+                result = AnalyzeResult.from_dict(_restore_temporal(json.load(f)))
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+
+    def put(self, model_id: str, document: bytes, result: AnalyzeResult) -> None:
+        path = self._path(model_id, document_key(document))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result.to_dict(), f, default=_to_json)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        with self._lock:
+            self._sizes[path] = os.path.getsize(path)
+            self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the total fits max_bytes (caller holds the lock)."""
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        by_age = sorted(self._sizes, key=lambda p: os.path.getmtime(p) if os.path.exists(p) else 0)
+        for path in by_age:
+            if total <= self.max_bytes:
+                break
+            total -= self._sizes.pop(path)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Document Intelligence Client Micro-Benchmark
+============================================
+
+Measures the per-document overhead of how the demo creates its client:
+
+- per-document: a new DocumentAnalysisClient for every file (what the
+  demo used to do) - new transport, new connections, new handshakes
+- shared:       get_document_analysis_client() from demos/shared - one
+  client and connection pool reused by every call and thread
+
+Both analyze the same document the same number of times; the difference
+in time per document is the client setup and connection cost.
+
+By default it runs against a local fake Document Intelligence server
+(demos/shared/fake_document_intelligence.py), which also counts the
+TCP connections each mode opens. Against a real resource (pass
+--endpoint/--key or set the usual environment variables and --real) the
+handshakes are TLS and the gap is larger.
+
+Usage:
+    python document-client-benchmark.py
+    python document-client-benchmark.py --documents 200 --concurrency 1,8,32 --pool-size 32
+    python document-client-benchmark.py --real --documents 10 --file ../../OCR/Invoice_1.pdf
+
+Prerequisites:
+    pip install azure-ai-formrecognizer
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DEMO_DIR, "..", "shared"))
+from fake_document_intelligence import start_server
+from service_clients import POOL_SIZE, get_document_analysis_client
+
+from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.core.credentials import AzureKeyCredential
+
+DEFAULT_FILE = os.path.join(DEMO_DIR, "..", "..", "OCR", "Invoice_1.pdf")
+# Seconds between status polls; the SDK default (1s) would hide the overhead
+POLL_INTERVAL = 0.02
+
+
+def analyze(client, document: bytes) -> None:
+    poller = client.begin_analyze_document("prebuilt-invoice", document=document,
+                                           polling_interval=POLL_INTERVAL)
+    poller.result()
+
+
+def run(mode: str, endpoint: str, key: str, document: bytes, documents: int,
+        concurrency: int, pool_size: int):
+    """Analyze `documents` copies with `concurrency` threads; seconds per document."""
+    def one(_):
+        start = time.perf_counter()
+        if mode == "shared":
+            analyze(get_document_analysis_client(endpoint, key, pool_size=pool_size), document)
+        else:
+            with DocumentAnalysisClient(endpoint=endpoint, credential=AzureKeyCredential(key)) as client:
+                analyze(client, document)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, range(documents)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-document overhead of per-call vs shared clients.")
+    parser.add_argument("--documents", type=int, default=100, help="Analyses per measurement")
+    parser.add_argument("--concurrency", default="1,8", help="Threads analyzing at once")
+    parser.add_argument("--pool-size", type=int, default=POOL_SIZE, help="Shared client connection pool")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server seconds per analysis")
+    parser.add_argument("--file", default=DEFAULT_FILE, help="Document to analyze")
+    parser.add_argument("--real", action="store_true", help="Use the AZURE_DOCUMENT_INTELLIGENCE_* resource")
+    parser.add_argument("--endpoint", default=os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT"))
+    parser.add_argument("--key", default=os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY"))
+    args = parser.parse_args()
+
+    server = None
+    if args.real:
+        if not args.endpoint or not args.key:
+            parser.error("--real needs AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT/KEY or --endpoint/--key")
+        endpoint, key = args.endpoint, args.key
+    else:
+        server = start_server(latency=args.latency)
+        endpoint, key = f"http://127.0.0.1:{server.server_port}", "benchmark"
+
+    with open(args.file, "rb") as f:
+        document = f.read()
+
+    print("⏱️  Document Intelligence Client Benchmark")
+    print("=" * 60)
+    print(f"Endpoint: {endpoint}" + ("" if args.real else f" (fake, {args.latency}s per analysis)"))
+    print(f"Document: {os.path.basename(args.file)} ({len(document):,} bytes), "
+          f"{args.documents} analyses per run, pool size {args.pool_size}")
+    print(f"\n{'mode':<14} {'conc':>5} {'ms/doc':>9} {'p95 ms':>9} {'docs/s':>8} {'connections':>12}")
+
+    for concurrency in [int(n) for n in args.concurrency.split(",")]:
+        mean_by_mode = {}
+        for mode in ("per-document", "shared"):
+            run(mode, endpoint, key, document, min(concurrency, args.documents), concurrency,
+                args.pool_size)  # warm up imports and, for shared, the pool
+            opened_before = server.connections_opened if server else 0
+            start = time.perf_counter()
+            latencies = run(mode, endpoint, key, document, args.documents, concurrency, args.pool_size)
+            elapsed = time.perf_counter() - start
+            connections = f"{server.connections_opened - opened_before}" if server else "-"
+            mean_by_mode[mode] = statistics.mean(latencies)
+            p95 = sorted(latencies)[max(0, int(0.95 * len(latencies)) - 1)]
+            print(f"{mode:<14} {concurrency:>5} {1000 * mean_by_mode[mode]:>9.1f} {1000 * p95:>9.1f} "
+                  f"{len(latencies) / elapsed:>8.1f} {connections:>12}")
+        saved = mean_by_mode["per-document"] - mean_by_mode["shared"]
+        print(f"{'':<14} {'':>5} 💡 shared client saves {1000 * saved:.1f} ms per document\n")
+
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,19 +20,49 @@ What this demo covers:
     - Extracting vendor info, dates, line items, totals
     - Handling multiple invoice formats
     - Converting unstructured documents to structured data
+    - Bulk mode: many invoices analyzed concurrently, results as JSONL
+    - Caching results by file content so repeat runs skip the service
+
+Bulk mode:
+    python document-intelligence-demo.py --bulk "../../OCR/Invoice_*.pdf" --output invoices.jsonl
+    python document-intelligence-demo.py --bulk ../../OCR --max-in-flight 16
+
+Result cache:
+    Results are cached in .analysis-cache/ by SHA-256 of the file and model;
+    pass --no-cache to always call the service. Environment variables:
+    DOCUMENT_ANALYSIS_CACHE_DIR, DOCUMENT_ANALYSIS_CACHE_MAX_MB (default 256)
 
 AI-102 Connection:
     This bridges to AI-102 where you'll create custom models,
     handle complex documents, and build production pipelines.
 """
 
+import argparse
+import datetime
+import glob
+import json
 import os
-from azure.ai.formrecognizer import DocumentAnalysisClient
-from azure.core.credentials import AzureKeyCredential
+import sys
+import time
+
+# Shared service clients (pooling, throttling, retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from service_clients import get_document_analysis_client
+
+from analysis_cache import AnalysisCache
 
 # Load configuration from environment variables
 ENDPOINT = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT")
 KEY = os.getenv("AZURE_DOCUMENT_INTELLIGENCE_KEY")
+# Bulk mode: analyses running on the service at once
+MAX_IN_FLIGHT = int(os.getenv("AZURE_DOCUMENT_INTELLIGENCE_MAX_IN_FLIGHT", "8"))
+# File types bulk mode picks up when given a directory
+DOCUMENT_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp")
+# Seconds to wait on the oldest analysis before re-checking all of them
+HARVEST_INTERVAL = 0.5
+# Analysis results cached by file content (bypass with --no-cache)
+ANALYSIS_CACHE_DIR = os.getenv("DOCUMENT_ANALYSIS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".analysis-cache"))
+ANALYSIS_CACHE_MAX_MB = float(os.getenv("DOCUMENT_ANALYSIS_CACHE_MAX_MB", "256"))
 
 # Validate environment variables
 if not ENDPOINT or not KEY:
@@ -43,6 +73,31 @@ if not ENDPOINT or not KEY:
     print("\nRefer to tim-env.txt for setup instructions.")
     exit(1)
 
+# Repeat runs answer unchanged files from disk instead of re-analyzing them;
+# created in __main__ unless --no-cache is given (None = no caching)
+analysis_cache = None
+
+
+def analyze_document(model_id, document):
+    """
+    Analyze document bytes with a prebuilt model, reusing the cached
+    result when the same bytes were already analyzed by that model.
+    """
+    if analysis_cache is not None:
+        result = analysis_cache.get(model_id, document)
+        if result is not None:
+            print("⚡ Cached result (file unchanged since it was last analyzed)")
+            return result
+    
+    # Shared client: one connection pool for every document
+    document_analysis_client = get_document_analysis_client(ENDPOINT, KEY)
+    poller = document_analysis_client.begin_analyze_document(model_id=model_id, document=document)
+    result = poller.result()
+    
+    if analysis_cache is not None:
+        analysis_cache.put(model_id, document, result)
+    return result
+
 
 def analyze_invoice(invoice_path):
     """
@@ -52,25 +107,13 @@ def analyze_invoice(invoice_path):
         invoice_path: Path to invoice file (PDF, JPEG, PNG, TIFF)
     """
     
-    # Create client
-    document_analysis_client = DocumentAnalysisClient(
-        endpoint=ENDPOINT, 
-        credential=AzureKeyCredential(KEY)
-    )
-    
     # Read invoice file
     with open(invoice_path, "rb") as invoice:
         print(f"\n📄 Analyzing invoice: {os.path.basename(invoice_path)}")
         print("=" * 60)
         
-        # Start analysis
-        poller = document_analysis_client.begin_analyze_document(
-            model_id="prebuilt-invoice", 
-            document=invoice
-        )
-        
-        # Get results
-        result = poller.result()
+        # Analyze (or reuse the cached result for these exact bytes)
+        result = analyze_document("prebuilt-invoice", invoice.read())
         
         # Process each invoice in the document
         for idx, invoice in enumerate(result.documents):
@@ -144,21 +187,11 @@ def analyze_receipt(receipt_path):
     Great for expense tracking!
     """
     
-    document_analysis_client = DocumentAnalysisClient(
-        endpoint=ENDPOINT, 
-        credential=AzureKeyCredential(KEY)
-    )
-    
     with open(receipt_path, "rb") as receipt:
         print(f"\n🧾 Analyzing receipt: {os.path.basename(receipt_path)}")
         print("=" * 60)
         
-        poller = document_analysis_client.begin_analyze_document(
-            model_id="prebuilt-receipt", 
-            document=receipt
-        )
-        
-        result = poller.result()
+        result = analyze_document("prebuilt-receipt", receipt.read())
         
         for idx, receipt in enumerate(result.documents):
             print(f"\nReceipt #{idx + 1}")
@@ -202,6 +235,127 @@ def analyze_receipt(receipt_path):
                 print(f"Total: ${total.value}")
 
 
+def _plain(value):
+    """Convert a field value (dates, currency, addresses, nested fields) to JSON types."""
+    if hasattr(value, "value_type") and hasattr(value, "value"):  # a DocumentField
+        return _plain(value.value)
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def extract_invoice_fields(invoice):
+    """All fields of one analyzed invoice as a JSON-ready dict."""
+    return {
+        "confidence": invoice.confidence,
+        "fields": {name: _plain(field) for name, field in invoice.fields.items()},
+    }
+
+
+def find_documents(source):
+    """Files to analyze: every document in a directory, or the matches of a glob pattern."""
+    if os.path.isdir(source):
+        paths = [os.path.join(source, name) for name in os.listdir(source)]
+        return sorted(path for path in paths if path.lower().endswith(DOCUMENT_EXTENSIONS))
+    return sorted(glob.glob(source))
+
+
+def analyze_invoices_bulk(source, output_path, max_in_flight=MAX_IN_FLIGHT):
+    """
+    Analyze many invoices concurrently and stream the results to JSONL.
+    
+    Up to max_in_flight long-running analyses run on the service at once.
+    Each poller is harvested as soon as it completes (whatever the order
+    they were started in), its result is written as one JSON line, and
+    the freed slot starts the next file. A failed file is recorded as an
+    error line and doesn't stop the batch. Files already in the result
+    cache are written straight away without a service call.
+    """
+    paths = find_documents(source)
+    print(f"📂 Bulk invoice analysis: {len(paths)} file(s) from {source}")
+    print(f"   Up to {max_in_flight} analyses in flight, results -> {output_path}")
+    
+    document_analysis_client = get_document_analysis_client(ENDPOINT, KEY)
+    pending = iter(paths)
+    in_flight = []  # (path, document bytes, poller, start time)
+    succeeded = failed = cached = 0
+    start = time.perf_counter()
+    
+    with open(output_path, "w", encoding="utf-8") as output:
+        def write(record):
+            nonlocal succeeded, failed, cached
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if record["status"] == "ok":
+                succeeded += 1
+                cached += record["cached"]
+                source_note = "cached" if record["cached"] else f"{record['seconds']:.1f}s"
+                print(f"   ✅ {os.path.basename(record['file'])} ({source_note})")
+            else:
+                failed += 1
+                print(f"   ❌ {os.path.basename(record['file'])}: {record['error']}")
+        
+        while True:
+            # Fill free slots with new analyses
+            while len(in_flight) < max_in_flight:
+                path = next(pending, None)
+                if path is None:
+                    break
+                started = time.perf_counter()
+                try:
+                    with open(path, "rb") as f:
+                        document = f.read()
+                    result = analysis_cache.get("prebuilt-invoice", document) if analysis_cache else None
+                    if result is not None:
+                        write({"file": path, "status": "ok", "cached": True,
+                               "invoices": [extract_invoice_fields(invoice) for invoice in result.documents],
+                               "seconds": round(time.perf_counter() - started, 3)})
+                        continue
+                    poller = document_analysis_client.begin_analyze_document(
+                        model_id="prebuilt-invoice",
+                        document=document
+                    )
+                    in_flight.append((path, document, poller, started))
+                except Exception as e:
+                    write({"file": path, "status": "error", "error": str(e),
+                           "seconds": round(time.perf_counter() - started, 3)})
+            if not in_flight:
+                break
+            
+            # Harvest whichever analyses have finished
+            finished = [item for item in in_flight if item[2].done()]
+            if not finished:
+                in_flight[0][2].wait(HARVEST_INTERVAL)
+                continue
+            for item in finished:
+                in_flight.remove(item)
+                path, document, poller, started = item
+                record = {"file": path}
+                try:
+                    result = poller.result()
+                    if analysis_cache is not None:
+                        analysis_cache.put("prebuilt-invoice", document, result)
+                    record.update(status="ok", cached=False,
+                                  invoices=[extract_invoice_fields(invoice) for invoice in result.documents])
+                except Exception as e:
+                    record.update(status="error", error=str(e))
+                record["seconds"] = round(time.perf_counter() - started, 3)
+                write(record)
+    
+    elapsed = time.perf_counter() - start
+    rate = len(paths) / elapsed * 60 if elapsed else 0.0
+    print(f"\n📊 {succeeded} analyzed ({cached} from cache), {failed} failed in {elapsed:.1f}s "
+          f"({rate:.0f} documents/min)")
+
+
 def main():
     """
     Demo Document Intelligence with various document types.
@@ -258,8 +412,27 @@ def main():
     print("  - Document Intelligence extracts structured data from documents")
     print("  - Prebuilt models handle common document types (invoices, receipts)")
     print("  - No training required for standard document formats")
+    if analysis_cache is not None:
+        stats = analysis_cache.stats()
+        print(f"  - Result cache: {stats['hits']} of {stats['hits'] + stats['misses']} "
+              f"documents reused ({stats['entries']} cached, {stats['bytes'] / 1024:.0f} KB)")
     print("  - AI-102 explores custom models for specialized documents")
     
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Azure AI Document Intelligence demo")
+    parser.add_argument("--bulk", metavar="DIR_OR_GLOB",
+                        help="Analyze every invoice in a directory or glob pattern concurrently")
+    parser.add_argument("--output", default="invoices.jsonl", help="JSONL results file for --bulk")
+    parser.add_argument("--max-in-flight", type=int, default=MAX_IN_FLIGHT,
+                        help="Analyses running at once in --bulk mode")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the analysis result cache (always call the service)")
+    args = parser.parse_args()
+
+    if not args.no_cache:
+        analysis_cache = AnalysisCache(ANALYSIS_CACHE_DIR, max_bytes=int(ANALYSIS_CACHE_MAX_MB * 1024 * 1024))
+    if args.bulk:
+        analyze_invoices_bulk(args.bulk, args.output, args.max_in_flight)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,379 @@
+"""
+Offline Reader for Archived Form Recognizer OCR Output
+======================================================
+
+The OCR folder keeps the raw service output next to the sample invoice:
+
+- Invoice_1.pdf.ocr.json     Read (v2.x) result: analyzeResult.readResults[]
+                             pages, each with lines[] and their words[],
+                             every one with an 8-number boundingBox
+- Invoice_1.pdf.labels.json  Labeling-tool fields: labels[] of values
+                             (page, text, boundingBoxes normalized to 0-1)
+
+This module loads them without calling the service, so field extraction
+can be re-run over archived OCR.
+
+Streaming: the files are read in chunks and only the parts we use are
+decoded - each line object of readResults[].lines[] is decoded on its
+own and appended to the arrays, the rest (pageResults, tables, ...) is
+scanned and dropped. Memory is bounded by the arrays being built, not
+by the size of the JSON.
+
+Array-backed: instead of one Python object per line and word, text is
+one string with an offsets array (item i = text[offsets[i]:offsets[i+1]])
+and boxes are a float32 (n, 8) matrix of x1, y1, ... x4, y4 corners in
+the page's unit. This keeps large archives compact and lets geometry be
+computed with vectorized NumPy.
+
+Prerequisites:
+    pip install numpy
+"""
+
+import json
+import re
+from array import array
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from spatial_index import MIN_OVERLAP, OcrSpatialIndex, box_bounds
+
+# Characters read from disk per refill of the parse buffer
+CHUNK_SIZE = 64 * 1024
+READ_RESULTS = ("analyzeResult", "readResults", None)
+PAGE_KEYS = ("page", "width", "height", "unit", "angle")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_SCALAR_END = re.compile(r"[,\]}\s]")
+_DECODER = json.JSONDecoder()
+
+Path = Tuple
+
+
+class _JsonStream:
+    """Chunked JSON reader: peeks at structure characters, decodes single values."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at the end of the file)."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Malformed JSON: expected one of {expected!r}, found {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self):
+        """Decode the complete value at the cursor, reading more input while it is cut off."""
+        while True:
+            char = self.peek()
+            if not char:
+                raise ValueError("Malformed JSON: unexpected end of file")
+            # A number at the end of the buffer may continue in the next chunk
+            if char not in '{["' and not self._eof and not _SCALAR_END.search(self._buffer, self._pos):
+                self._fill()
+                continue
+            try:
+                value, self._pos = _DECODER.raw_decode(self._buffer, self._pos)
+                return value
+            except json.JSONDecodeError:
+                if self._eof or not self._fill():
+                    raise
+
+
+def _step_matches(pattern, step) -> bool:
+    return pattern is None or pattern == step
+
+
+def _walk(stream: _JsonStream, path: Path, targets: Sequence[Path]) -> Iterator[Tuple[Path, object]]:
+    if any(len(target) == len(path) for target in targets):
+        yield path, stream.value()
+        return
+    opener = stream.peek()
+    if opener not in "{[":
+        stream.value()  # a scalar nobody asked for
+        return
+
+    stream.take(opener)
+    closer = "}" if opener == "{" else "]"
+    if stream.peek() == closer:
+        stream.take(closer)
+        return
+    index = 0
+    while True:
+        if opener == "{":
+            step = stream.value()
+            stream.take(":")
+        else:
+            step = index
+            index += 1
+        depth = len(path)
+        child_targets = [t for t in targets if len(t) > depth and _step_matches(t[depth], step)]
+        yield from _walk(stream, path + (step,), child_targets)
+        if stream.take("," + closer) == closer:
+            return
+
+
+def iter_json_items(f, targets: Sequence[Path], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[Path, object]]:
+    """
+    Stream the values at the given paths out of a JSON text file.
+
+    A path is a tuple of object keys and array indices, with None matching
+    any key or index, e.g. ("analyzeResult", "readResults", None, "lines", None)
+    yields every line of every page. Yields (concrete path, value) in file
+    order; each yielded value is decoded on its own, everything else is
+    skipped without building it.
+    """
+    stream = _JsonStream(f, chunk_size)
+    yield from _walk(stream, (), [tuple(target) for target in targets])
+    if stream.peek():
+        raise ValueError("Malformed JSON: trailing data after the document")
+
+
+class _TextColumn:
+    """Strings appended into one text buffer plus an offsets array."""
+
+    def __init__(self):
+        self.pieces = []
+        self.offsets = array("q", [0])
+
+    def append(self, text: str) -> None:
+        self.pieces.append(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+
+    def freeze(self) -> Tuple[str, np.ndarray]:
+        return "".join(self.pieces), np.frombuffer(self.offsets, dtype=np.int64)
+
+
+def _box(values: Sequence[float]) -> Sequence[float]:
+    if len(values) != 8:
+        raise ValueError(f"Expected an 8-number boundingBox, got {len(values)} numbers")
+    return values
+
+
+def _boxes(flat: array) -> np.ndarray:
+    return np.frombuffer(flat, dtype=np.float32).reshape(-1, 8)
+
+
+class OcrLayout:
+    """
+    Pages, lines and words of a Read result in flat arrays.
+
+    Pages (index p): page_numbers[p], page_sizes[p] = (width, height),
+    page_units[p], page_angles[p].
+
+    Lines (index i): line(i) text, line_boxes[i], line_pages[i] (page
+    index) and words line_word_offsets[i]:line_word_offsets[i + 1].
+
+    Words (index j): word(j) text, word_boxes[j], word_confidences[j],
+    word_lines[j] and word_pages[j].
+    """
+
+    def __init__(self, page_numbers, page_sizes, page_units, page_angles,
+                 line_text, line_offsets, line_boxes, line_pages, line_word_offsets,
+                 word_text, word_offsets, word_boxes, word_confidences):
+        self.page_numbers = page_numbers
+        self.page_sizes = page_sizes
+        self.page_units = page_units
+        self.page_angles = page_angles
+        self.line_text = line_text
+        self.line_offsets = line_offsets
+        self.line_boxes = line_boxes
+        self.line_pages = line_pages
+        self.line_word_offsets = line_word_offsets
+        self.word_text = word_text
+        self.word_offsets = word_offsets
+        self.word_boxes = word_boxes
+        self.word_confidences = word_confidences
+        self.word_lines = np.repeat(np.arange(len(line_pages), dtype=np.int32), np.diff(line_word_offsets))
+        self.word_pages = line_pages[self.word_lines]
+
+    @property
+    def num_lines(self) -> int:
+        return len(self.line_pages)
+
+    @property
+    def num_words(self) -> int:
+        return len(self.word_lines)
+
+    def line(self, i: int) -> str:
+        return self.line_text[self.line_offsets[i]:self.line_offsets[i + 1]]
+
+    def word(self, j: int) -> str:
+        return self.word_text[self.word_offsets[j]:self.word_offsets[j + 1]]
+
+    def line_words(self, i: int) -> List[str]:
+        return [self.word(j) for j in range(self.line_word_offsets[i], self.line_word_offsets[i + 1])]
+
+    def page_index(self, page_number: int) -> int:
+        matches = np.flatnonzero(self.page_numbers == page_number)
+        if not len(matches):
+            raise KeyError(f"No page {page_number} in this OCR result")
+        return int(matches[0])
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the arrays and text buffers."""
+        arrays = (self.page_sizes, self.line_offsets, self.line_boxes, self.line_pages,
+                  self.line_word_offsets, self.word_offsets, self.word_boxes,
+                  self.word_confidences, self.word_lines, self.word_pages)
+        return sum(a.nbytes for a in arrays) + len(self.line_text) + len(self.word_text)
+
+
+def load_ocr(path: str, chunk_size: int = CHUNK_SIZE) -> OcrLayout:
+    """Stream a Read (v2.x) OCR result file into an OcrLayout."""
+    pages = {}  # readResults index -> {page, width, height, unit, angle}
+    line_texts, word_texts = _TextColumn(), _TextColumn()
+    line_boxes, word_boxes = array("f"), array("f")
+    line_pages, word_confidences = array("i"), array("f")
+    line_word_offsets = array("q", [0])
+
+    targets = [READ_RESULTS + (key,) for key in PAGE_KEYS] + [READ_RESULTS + ("lines", None)]
+    with open(path, encoding="utf-8") as f:
+        for item_path, value in iter_json_items(f, targets, chunk_size):
+            page_index = item_path[2]
+            if item_path[3] != "lines":
+                pages.setdefault(page_index, {})[item_path[3]] = value
+                continue
+            line_texts.append(value.get("text", ""))
+            line_boxes.extend(_box(value["boundingBox"]))
+            line_pages.append(page_index)
+            for word in value.get("words", ()):
+                word_texts.append(word.get("text", ""))
+                word_boxes.extend(_box(word["boundingBox"]))
+                word_confidences.append(word.get("confidence", 1.0))
+            line_word_offsets.append(len(word_confidences))
+
+    order = sorted(pages)
+    if order != list(range(len(order))) or (len(line_pages) and max(line_pages) >= len(order)):
+        raise ValueError(f"{path}: readResults pages are missing page metadata")
+    line_text, line_offsets = line_texts.freeze()
+    word_text, word_offsets = word_texts.freeze()
+    return OcrLayout(
+        page_numbers=np.array([pages[p].get("page", p + 1) for p in order], dtype=np.int32),
+        page_sizes=np.array([(pages[p].get("width", 0), pages[p].get("height", 0)) for p in order],
+                            dtype=np.float32).reshape(-1, 2),
+        page_units=[pages[p].get("unit", "") for p in order],
+        page_angles=np.array([pages[p].get("angle", 0) for p in order], dtype=np.float32),
+        line_text=line_text,
+        line_offsets=line_offsets,
+        line_boxes=_boxes(line_boxes),
+        line_pages=np.frombuffer(line_pages, dtype=np.int32),
+        line_word_offsets=np.frombuffer(line_word_offsets, dtype=np.int64),
+        word_text=word_text,
+        word_offsets=word_offsets,
+        word_boxes=_boxes(word_boxes),
+        word_confidences=np.frombuffer(word_confidences, dtype=np.float32),
+    )
+
+
+class LabelSet:
+    """
+    Labeled fields of a document in flat arrays.
+
+    Values (index v; one field can have several, e.g. one per word):
+    value(v) text, value_labels[v] (index into names), value_pages[v]
+    (page number) and boxes box_offsets[v]:box_offsets[v + 1] of boxes,
+    normalized to 0-1 of the page width/height.
+    """
+
+    def __init__(self, document, names, value_labels, value_pages, value_text, value_offsets,
+                 box_offsets, boxes):
+        self.document = document
+        self.names = names
+        self.value_labels = value_labels
+        self.value_pages = value_pages
+        self.value_text = value_text
+        self.value_offsets = value_offsets
+        self.box_offsets = box_offsets
+        self.boxes = boxes
+        self.box_values = np.repeat(np.arange(len(value_labels), dtype=np.int32), np.diff(box_offsets))
+
+    def value(self, v: int) -> str:
+        return self.value_text[self.value_offsets[v]:self.value_offsets[v + 1]]
+
+    def fields(self) -> Dict[str, str]:
+        """Label name -> its values' text joined with spaces (labeling-tool order)."""
+        values = {name: [] for name in self.names}
+        for v, label in enumerate(self.value_labels):
+            values[self.names[label]].append(self.value(v))
+        return {name: " ".join(texts) for name, texts in values.items()}
+
+
+def load_labels(path: str, chunk_size: int = CHUNK_SIZE) -> LabelSet:
+    """Stream a labeling-tool .labels.json file into a LabelSet."""
+    document = ""
+    names = []
+    value_labels, value_pages = array("i"), array("i")
+    value_texts = _TextColumn()
+    box_offsets = array("q", [0])
+    boxes = array("f")
+
+    with open(path, encoding="utf-8") as f:
+        for item_path, value in iter_json_items(f, [("document",), ("labels", None)], chunk_size):
+            if item_path == ("document",):
+                document = value
+                continue
+            names.append(value["label"])
+            for labeled in value.get("value") or ():
+                value_labels.append(len(names) - 1)
+                value_pages.append(labeled.get("page", 1))
+                value_texts.append(labeled.get("text", ""))
+                for box in labeled.get("boundingBoxes", ()):
+                    boxes.extend(_box(box))
+                box_offsets.append(len(boxes) // 8)
+
+    value_text, value_offsets = value_texts.freeze()
+    return LabelSet(
+        document=document,
+        names=names,
+        value_labels=np.frombuffer(value_labels, dtype=np.int32),
+        value_pages=np.frombuffer(value_pages, dtype=np.int32),
+        value_text=value_text,
+        value_offsets=value_offsets,
+        box_offsets=np.frombuffer(box_offsets, dtype=np.int64),
+        boxes=_boxes(boxes),
+    )
+
+
+def extract_labeled_fields(layout: OcrLayout, labels: LabelSet,
+                           min_overlap: float = MIN_OVERLAP) -> Dict[str, str]:
+    """
+    Re-extract every labeled field from the OCR words: the words lying
+    inside each label box (looked up with one batched spatial-index query
+    per page) are joined in reading order.
+    """
+    index = OcrSpatialIndex(layout, level="words")
+    box_pages = labels.value_pages[labels.box_values]
+    words_per_box = [[] for _ in range(len(labels.boxes))]
+    for page in np.unique(box_pages):
+        boxes = np.flatnonzero(box_pages == page)
+        query_ids, word_ids = index.search_many(int(page), box_bounds(labels.boxes[boxes]), min_overlap)
+        for q, j in zip(query_ids.tolist(), word_ids.tolist()):
+            words_per_box[boxes[q]].append(layout.word(j))
+
+    words = {name: [] for name in labels.names}
+    for b, v in enumerate(labels.box_values):
+        words[labels.names[labels.value_labels[v]]] += words_per_box[b]
+    return {name: " ".join(texts) for name, texts in words.items()}
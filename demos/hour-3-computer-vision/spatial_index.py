@@ -0,0 +1,172 @@
+"""
+Spatial Grid Index over OCR Boxes
+=================================
+
+Finding "which OCR words lie inside this labeled box" by comparing every
+label with every word is a pairwise join. This index answers it from a
+uniform grid instead:
+
+- Every box is first normalized to 0-1 of its page (OCR boxes come in
+  inches or pixels, label boxes are already normalized), and reduced to
+  its axis-aligned bounds (x0, y0, x1, y1)
+- Each page gets a grid of cells; every box is registered in the cells
+  it overlaps (CSR layout: cell_offsets + cell_items)
+- A query only looks at the boxes registered in the cells it overlaps,
+  then keeps those that overlap it by at least `min_overlap` of their own
+  area - so a query costs about the number of nearby boxes, not the page
+
+search_many() takes all the query boxes of a page at once and does the
+cell lookup, candidate gather and overlap test as NumPy array operations.
+
+Prerequisites:
+    pip install numpy
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+# Average boxes per grid cell the grid is sized for
+BOXES_PER_CELL = 4
+MAX_GRID_SIZE = 256
+# Default share of a box's area that must fall inside a query box
+MIN_OVERLAP = 0.5
+
+
+def box_bounds(boxes: np.ndarray) -> np.ndarray:
+    """(n, 4) x0, y0, x1, y1 bounds of (n, 8) corner boxes."""
+    corners = np.asarray(boxes, dtype=np.float32).reshape(-1, 4, 2)
+    return np.concatenate([corners.min(axis=1), corners.max(axis=1)], axis=1)
+
+
+def normalize_boxes(boxes: np.ndarray, width: float, height: float) -> np.ndarray:
+    """Scale (n, 8) corner boxes from page units (inch, pixel) to 0-1 of the page."""
+    scale = np.array([width, height] * 4, dtype=np.float32)
+    return np.asarray(boxes, dtype=np.float32) / scale
+
+
+class GridIndex:
+    """
+    Uniform-grid index over normalized (n, 4) bounds of one page.
+
+    Args:
+        bounds: x0, y0, x1, y1 per box, in 0-1 page coordinates
+        grid_size: Cells per side (default: sized for BOXES_PER_CELL)
+    """
+
+    def __init__(self, bounds: np.ndarray, grid_size: int = 0):
+        self.bounds = np.asarray(bounds, dtype=np.float32).reshape(-1, 4)
+        n = len(self.bounds)
+        self.grid_size = grid_size or int(np.clip(np.ceil(np.sqrt(n / BOXES_PER_CELL)), 1, MAX_GRID_SIZE))
+        self.areas = np.maximum((self.bounds[:, 2] - self.bounds[:, 0]) * (self.bounds[:, 3] - self.bounds[:, 1]),
+                                np.finfo(np.float32).tiny)
+
+        cells, items = self._cells_of(self.bounds)
+        order = np.argsort(cells, kind="stable")
+        self.cell_items = items[order].astype(np.int32)
+        self.cell_offsets = np.zeros(self.grid_size * self.grid_size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.grid_size * self.grid_size), out=self.cell_offsets[1:])
+
+    def _cell_ranges(self, bounds: np.ndarray) -> np.ndarray:
+        """(n, 4) first/last cell column and row covered by each box (clamped to the page)."""
+        cells = np.floor(bounds * self.grid_size).astype(np.int64)
+        return np.clip(cells, 0, self.grid_size - 1)
+
+    def _cells_of(self, bounds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(cell id, box index) for every cell every box overlaps."""
+        ranges = self._cell_ranges(bounds)
+        columns = ranges[:, 2] - ranges[:, 0] + 1
+        counts = columns * (ranges[:, 3] - ranges[:, 1] + 1)
+        boxes = np.repeat(np.arange(len(bounds)), counts)
+        # k-th cell of a box's rectangle -> (column, row)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        column = ranges[boxes, 0] + k % columns[boxes]
+        row = ranges[boxes, 1] + k // columns[boxes]
+        return row * self.grid_size + column, boxes
+
+    def search_many(self, queries: np.ndarray, min_overlap: float = MIN_OVERLAP) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (query, box) pairs where at least min_overlap of the box's area
+        lies inside the query. queries are (m, 4) normalized bounds; returns
+        two index arrays sorted by query, then box.
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, 4)
+        if not len(queries) or not len(self.bounds):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Gather every box registered in every cell each query overlaps
+        cells, query_ids = self._cells_of(queries)
+        starts = self.cell_offsets[cells]
+        counts = self.cell_offsets[cells + 1] - starts
+        pair_queries = np.repeat(query_ids, counts)
+        positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+        pair_boxes = self.cell_items[positions].astype(np.int64)
+
+        # A box spanning several cells shows up once per cell
+        pairs = np.unique(pair_queries * len(self.bounds) + pair_boxes)
+        pair_queries, pair_boxes = pairs // len(self.bounds), pairs % len(self.bounds)
+
+        q, b = queries[pair_queries], self.bounds[pair_boxes]
+        overlap_w = np.minimum(q[:, 2], b[:, 2]) - np.maximum(q[:, 0], b[:, 0])
+        overlap_h = np.minimum(q[:, 3], b[:, 3]) - np.maximum(q[:, 1], b[:, 1])
+        overlap = np.clip(overlap_w, 0, None) * np.clip(overlap_h, 0, None)
+        keep = overlap >= min_overlap * self.areas[pair_boxes]
+        return pair_queries[keep], pair_boxes[keep]
+
+    def search(self, query, min_overlap: float = MIN_OVERLAP) -> np.ndarray:
+        """Indices of the boxes inside one (4,) normalized query box."""
+        return self.search_many(np.asarray(query).reshape(1, 4), min_overlap)[1]
+
+
+class OcrSpatialIndex:
+    """
+    One GridIndex per page over the words (or lines) of an OcrLayout.
+
+    Queries take page numbers and 0-1 page coordinates and return global
+    word/line indices of the layout, in OCR (reading) order.
+
+    Args:
+        layout: An ocr_archive.OcrLayout
+        level: "words" or "lines"
+    """
+
+    def __init__(self, layout, level: str = "words"):
+        if level not in ("words", "lines"):
+            raise ValueError(f"level must be 'words' or 'lines', not {level!r}")
+        self.layout = layout
+        self.level = level
+        boxes = layout.word_boxes if level == "words" else layout.line_boxes
+        pages = layout.word_pages if level == "words" else layout.line_pages
+        self._text = layout.word if level == "words" else layout.line
+
+        self._members = []  # per page index: global indices, in OCR order
+        self._grids = []
+        for p, (width, height) in enumerate(layout.page_sizes):
+            members = np.flatnonzero(pages == p)
+            self._members.append(members)
+            self._grids.append(GridIndex(box_bounds(normalize_boxes(boxes[members], width, height))))
+
+    def search_many(self, page_number: int, queries: np.ndarray,
+                    min_overlap: float = MIN_OVERLAP) -> Tuple[np.ndarray, np.ndarray]:
+        """(query, item) pairs for (m, 4) normalized bounds on one page; items are global indices."""
+        p = self.layout.page_index(page_number)
+        query_ids, local = self._grids[p].search_many(queries, min_overlap)
+        return query_ids, self._members[p][local]
+
+    def search(self, page_number: int, query, min_overlap: float = MIN_OVERLAP) -> np.ndarray:
+        p = self.layout.page_index(page_number)
+        return self._members[p][self._grids[p].search(query, min_overlap)]
+
+    def text_in(self, page_number: int, query, min_overlap: float = MIN_OVERLAP) -> str:
+        """Text of the words/lines inside a normalized query box, in reading order."""
+        separator = " " if self.level == "words" else "\n"
+        return separator.join(self._text(int(i)) for i in self.search(page_number, query, min_overlap))
+
+    def texts_in(self, page_number: int, queries: np.ndarray, min_overlap: float = MIN_OVERLAP) -> List[str]:
+        """text_in() for every query box of a page in one batch."""
+        query_ids, items = self.search_many(page_number, queries, min_overlap)
+        texts = [[] for _ in range(len(np.asarray(queries).reshape(-1, 4)))]
+        for q, i in zip(query_ids.tolist(), items.tolist()):
+            texts[q].append(self._text(i))
+        separator = " " if self.level == "words" else "\n"
+        return [separator.join(parts) for parts in texts]
@@ -32,13 +32,29 @@ AI-102 Preview:
 import os
 import json
 import sys
-from openai import AzureOpenAI
+import time
+import asyncio
+
+# Shared service clients (pooling, throttling, retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "shared"))
+from service_clients import get_async_openai_client, get_openai_client, throttled, throttled_async
+from llm_metrics import METRICS, instrumented, instrumented_async, serve_metrics
+
+from prompt_cache import PromptCache
 
 # Load configuration from environment variables
 ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 KEY = os.getenv("AZURE_OPENAI_KEY")
 DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "gpt-4o-mini")
 API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-01")
+# Upper bound on completions running at once in the async patterns
+MAX_CONCURRENT_REQUESTS = int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "8"))
+# Response cache: deterministic calls (temperature 0 or fixed seed) are replayed
+PROMPT_CACHE_DIR = os.getenv("PROMPT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".prompt-cache"))
+PROMPT_CACHE_TTL_SECONDS = float(os.getenv("PROMPT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+PROMPT_CACHE_ALL = os.getenv("PROMPT_CACHE_ALL", "false").lower() in ("1", "true", "yes")
+# Serve Prometheus metrics for the model calls on this port (unset = off)
+METRICS_PORT = os.getenv("LLM_METRICS_PORT")
 
 # Validate environment variables
 if not ENDPOINT or not KEY:
@@ -51,13 +67,39 @@ if not ENDPOINT or not KEY:
     print("\nRefer to tim-env.txt for setup instructions.")
     sys.exit(1)
 
-# Initialize client
-client = AzureOpenAI(
-    api_key=KEY,
-    api_version=API_VERSION,
-    azure_endpoint=ENDPOINT
+# Initialize client (shared with other demos, pooled connections)
+client = get_openai_client(ENDPOINT, KEY, API_VERSION)
+
+# Async client for patterns that fan out many independent calls
+async_client = get_async_openai_client(ENDPOINT, KEY, API_VERSION)
+
+# Completion calls throttled to the deployment quota, retried on 429
+chat_completion = throttled(client.chat.completions.create)
+chat_completion_async = throttled_async(async_client.chat.completions.create)
+
+# Cache keyed on the full request parameters (memory LRU + SQLite with TTL)
+os.makedirs(PROMPT_CACHE_DIR, exist_ok=True)
+prompt_cache = PromptCache(
+    path=os.path.join(PROMPT_CACHE_DIR, "responses.sqlite"),
+    ttl_seconds=PROMPT_CACHE_TTL_SECONDS,
+    cache_all=PROMPT_CACHE_ALL
 )
 
+if METRICS_PORT:
+    serve_metrics(int(METRICS_PORT))
+
+
+@instrumented("chat.completions", cache_status=prompt_cache.last_status)
+def create_chat_completion(**params):
+    """Throttled chat completion, served from prompt_cache when possible"""
+    return prompt_cache.create(chat_completion, **params)
+
+
+@instrumented_async("chat.completions", cache_status=prompt_cache.last_status)
+async def create_chat_completion_async(**params):
+    """Async version of create_chat_completion"""
+    return await prompt_cache.acreate(chat_completion_async, **params)
+
 
 def basic_prompt(question):
     """Basic zero-shot prompt - starting point"""
@@ -65,7 +107,7 @@ def basic_prompt(question):
     print("=" * 60)
     print(f"Question: {question}")
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "user", "content": question}
@@ -96,7 +138,7 @@ Let's think through this carefully:
 
 Show your reasoning at each step."""
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "system", "content": "You are a helpful assistant that explains your reasoning step by step."},
@@ -123,7 +165,7 @@ def few_shot_learning(task, examples, new_input):
     
     prompt += f"\nNow solve this:\nInput: {new_input}\nOutput:"
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "system", "content": "Follow the pattern shown in the examples exactly."},
@@ -148,7 +190,7 @@ def self_consistency_check(question, num_samples=3):
     answers = []
     
     for i in range(num_samples):
-        response = client.chat.completions.create(
+        response = create_chat_completion(
             model=DEPLOYMENT,
             messages=[
                 {"role": "system", "content": "Provide a clear, concise answer."},
@@ -162,7 +204,19 @@ def self_consistency_check(question, num_samples=3):
         print(f"\nAnswer {i+1}: {answer}")
     
     # Ask the model to synthesize
-    synthesis_prompt = f"""Given these {num_samples} answers to the question "{question}":
+    final_response = create_chat_completion(
+        model=DEPLOYMENT,
+        messages=_synthesis_messages(question, answers),
+        temperature=0.2
+    )
+    
+    print(f"\n🎯 Synthesized Answer:\n{final_response.choices[0].message.content}")
+    return final_response.choices[0].message.content
+
+
+def _synthesis_messages(question, answers):
+    """Messages asking the model to reconcile several sampled answers"""
+    synthesis_prompt = f"""Given these {len(answers)} answers to the question "{question}":
 
 {chr(10).join([f"Answer {i+1}: {ans}" for i, ans in enumerate(answers)])}
 
@@ -172,16 +226,53 @@ Please:
 3. Provide a final, synthesized answer that represents the consensus
 4. Rate your confidence (Low/Medium/High) based on answer consistency"""
     
-    final_response = client.chat.completions.create(
+    return [
+        {"role": "system", "content": "You are an expert at analyzing and synthesizing information."},
+        {"role": "user", "content": synthesis_prompt}
+    ]
+
+
+async def self_consistency_check_async(question, num_samples=3, max_concurrency=MAX_CONCURRENT_REQUESTS):
+    """
+    Self-consistency with the samples requested concurrently.
+    All samples run at once (bounded by a semaphore), so wall time is
+    close to one sample plus the synthesis call instead of N samples.
+    """
+    print("\n🔄 SELF-CONSISTENCY CHECK (concurrent)")
+    print("=" * 60)
+    print(f"Question: {question}")
+    print(f"Generating {num_samples} independent answers concurrently...")
+    
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def sample(i):
+        async with semaphore:
+            response = await create_chat_completion_async(
+                model=DEPLOYMENT,
+                messages=[
+                    {"role": "system", "content": "Provide a clear, concise answer."},
+                    {"role": "user", "content": question}
+                ],
+                temperature=0.8,  # Higher temperature for diversity
+                seed=i  # Different seed for variation
+            )
+            return response.choices[0].message.content
+    
+    start = time.perf_counter()
+    answers = await asyncio.gather(*(sample(i) for i in range(num_samples)))
+    sampling_time = time.perf_counter() - start
+    
+    for i, answer in enumerate(answers):
+        print(f"\nAnswer {i+1}: {answer}")
+    
+    final_response = await create_chat_completion_async(
         model=DEPLOYMENT,
-        messages=[
-            {"role": "system", "content": "You are an expert at analyzing and synthesizing information."},
-            {"role": "user", "content": synthesis_prompt}
-        ],
+        messages=_synthesis_messages(question, answers),
         temperature=0.2
     )
     
     print(f"\n🎯 Synthesized Answer:\n{final_response.choices[0].message.content}")
+    print(f"\n⏱️  Samples: {sampling_time:.2f}s | Total: {time.perf_counter() - start:.2f}s")
     return final_response.choices[0].message.content
 
 
@@ -211,7 +302,7 @@ Output format:
 
 Generate the JSON now:"""
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "system", "content": "You are a JSON generator. Output only valid JSON without any markdown formatting or explanations."},
@@ -259,7 +350,7 @@ Provide:
 2. Brief explanation of key improvements
 3. Expected quality improvement (Low/Medium/High)"""
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "system", "content": "You are an expert at crafting effective prompts for large language models."},
@@ -279,7 +370,7 @@ def role_based_expert_prompting(question, role):
     print(f"Question: {question}")
     print(f"Expert Role: {role}")
     
-    response = client.chat.completions.create(
+    response = create_chat_completion(
         model=DEPLOYMENT,
         messages=[
             {"role": "system", "content": f"You are {role}. Answer based on your expertise, citing relevant principles and best practices from your field."},
@@ -332,7 +423,7 @@ def main():
     print("="*80)
     
     complex_question = "What are the three most important factors to consider when designing a scalable microservices architecture?"
-    self_consistency_check(complex_question)
+    asyncio.run(self_consistency_check_async(complex_question))
     
     # Demo 4: Structured Output
     print("\n" + "="*80)
@@ -363,6 +454,12 @@ def main():
         role="a senior distributed systems architect with 20 years of experience at major tech companies"
     )
     
+    stats = prompt_cache.stats()
+    print(f"\n🗄️  Prompt cache: {stats['calls_saved']} calls saved, "
+          f"{stats['misses']} sent, {stats['bypassed']} not cacheable")
+    print("\n⏱️  Model call metrics:")
+    print(METRICS.summary())
+    
     print("\n\n✅ Advanced Prompt Engineering Demo Complete!")
     print("-" * 60)
     print("🎯 Key Takeaways:")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Batch Prompt Runner for the Prompt Engineering Patterns
+=======================================================
+
+Runs a JSONL file of tasks through the pattern functions in
+advanced-prompt-engineering.py, instead of the hard-coded main().
+
+Each input line names a pattern function and its arguments:
+    {"id": "cot-1", "pattern": "chain_of_thought_prompt", "args": {"question": "..."}}
+    {"id": "role-1", "pattern": "role_based_expert_prompting", "args": ["question", "a CFO"]}
+
+How it runs:
+- Tasks are streamed from the input file (never loaded all at once) and
+  run on a bounded pool of worker threads
+- Each result is appended to the output JSONL as soon as it finishes
+- The output file is the checkpoint: on restart, tasks already recorded
+  as "ok" are skipped, so a crashed run resumes where it left off
+  (failed tasks are retried)
+- At the end it reports throughput and p50/p95 latency per pattern
+
+Usage:
+    python batch-prompt-runner.py prompt-tasks.example.jsonl -o results.jsonl
+    python batch-prompt-runner.py tasks.jsonl -o results.jsonl --concurrency 16
+    python batch-prompt-runner.py tasks.jsonl -o results.jsonl --fresh   # ignore the checkpoint
+
+Prerequisites:
+    pip install openai
+    Same environment variables as advanced-prompt-engineering.py
+"""
+
+import argparse
+import importlib.util
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Set
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Pattern functions that can be named in a task's "pattern" field
+PATTERN_NAMES = (
+    "basic_prompt",
+    "chain_of_thought_prompt",
+    "few_shot_learning",
+    "self_consistency_check",
+    "structured_output_generation",
+    "meta_prompting_optimization",
+    "role_based_expert_prompting",
+)
+
+
+def load_patterns() -> Dict:
+    """Import advanced-prompt-engineering.py (hyphenated, so not importable by name)."""
+    path = os.path.join(DEMO_DIR, "advanced-prompt-engineering.py")
+    spec = importlib.util.spec_from_file_location("advanced_prompt_engineering", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return {name: getattr(module, name) for name in PATTERN_NAMES}
+
+
+def read_tasks(path: str) -> Iterator[Dict]:
+    """Stream tasks from a JSONL file; tasks without an id get line-<n>."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            task = json.loads(line)
+            task.setdefault("id", f"line-{line_number}")
+            yield task
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Ids of tasks already completed in the output file. A partial last
+    line (the process died mid-write) is cut off so appends stay valid.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].decode("utf-8").splitlines():
+        record = json.loads(line)
+        if record.get("status") == "ok":
+            done.add(record["id"])
+    return done
+
+
+def run_task(patterns: Dict, task: Dict) -> Dict:
+    """Run one task, capturing its result or error and its latency."""
+    start = time.perf_counter()
+    record = {"id": task["id"], "pattern": task.get("pattern")}
+    try:
+        function = patterns[task["pattern"]]
+        args = task.get("args", {})
+        result = function(**args) if isinstance(args, dict) else function(*args)
+        record.update(status="ok", result=result)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}")
+    record["latency_seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_batch(input_path: str, output_path: str, concurrency: int,
+              fresh: bool = False, quiet: bool = True) -> Dict[str, List[float]]:
+    """
+    Run every pending task with at most `concurrency` in flight, appending
+    results to output_path as they finish. Returns latencies per pattern.
+    """
+    if fresh and os.path.exists(output_path):
+        os.remove(output_path)
+    done = load_checkpoint(output_path)
+    if done:
+        print(f"♻️  Resuming: {len(done)} task(s) already completed in {output_path}")
+
+    console = sys.stdout
+    patterns = load_patterns()
+    latencies = defaultdict(list)
+    failures = 0
+    skipped = 0
+
+    # The pattern functions print as they go; from parallel threads that
+    # is just noise, so send it to /dev/null unless asked for
+    devnull = open(os.devnull, "w") if quiet else None
+    if devnull:
+        sys.stdout = devnull
+    try:
+        with open(output_path, "a", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=concurrency) as pool:
+            pending = set()
+
+            def record(future):
+                nonlocal failures
+                result = future.result()
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                os.fsync(out.fileno())  # the checkpoint must survive a crash
+                if result["status"] == "ok":
+                    latencies[result["pattern"]].append(result["latency_seconds"])
+                else:
+                    failures += 1
+                    print(f"❌ {result['id']}: {result['error']}", file=console)
+
+            for task in read_tasks(input_path):
+                if task["id"] in done:
+                    skipped += 1
+                    continue
+                if len(pending) >= concurrency:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(future)
+                pending.add(pool.submit(run_task, patterns, task))
+
+            for future in wait(pending).done:
+                record(future)
+    finally:
+        if devnull:
+            sys.stdout = console
+            devnull.close()
+
+    completed = sum(len(values) for values in latencies.values())
+    print(f"✅ {completed} task(s) completed, {failures} failed, {skipped} skipped (checkpoint)")
+    return latencies
+
+
+def print_report(latencies: Dict[str, List[float]], elapsed: float) -> None:
+    """Throughput and p50/p95 latency per pattern."""
+    print(f"\n📊 Batch report ({elapsed:.1f}s wall time)")
+    print(f"{'pattern':<30} {'tasks':>6} {'tasks/min':>10} {'p50 s':>7} {'p95 s':>7}")
+    for pattern, values in sorted(latencies.items()):
+        print(f"{pattern:<30} {len(values):>6} {len(values) / elapsed * 60:>10.1f} "
+              f"{percentile(values, 50):>7.2f} {percentile(values, 95):>7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompt-pattern tasks.")
+    parser.add_argument("tasks", help="Input JSONL: one {id, pattern, args} task per line")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="Output JSONL (also the checkpoint)")
+    parser.add_argument("-c", "--concurrency", type=int,
+                        default=int(os.getenv("AZURE_OPENAI_MAX_CONCURRENCY", "8")),
+                        help="Tasks in flight at once")
+    parser.add_argument("--fresh", action="store_true", help="Discard previous results instead of resuming")
+    parser.add_argument("--verbose", action="store_true", help="Show each pattern's own output")
+    args = parser.parse_args()
+
+    print("🚀 Batch Prompt Runner")
+    print("=" * 60)
+    start = time.perf_counter()
+    latencies = run_batch(args.tasks, args.output, args.concurrency,
+                          fresh=args.fresh, quiet=not args.verbose)
+    print_report(latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
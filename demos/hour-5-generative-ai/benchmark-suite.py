@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Suite for the Hour 5 Demos
+============================================
+
+Times retrieval and generation without Azure: the demos are pointed at
+the local fake Azure OpenAI server (demos/shared/fake_azure_openai.py),
+which answers with configurable latency and token rate, so every run
+sees the same service and results can be compared commit to commit.
+
+Scenarios (each at every corpus size x concurrency level):
+- search_documents               retrieval only (embedding + ranking)
+- rag_query                      retrieval + one chat completion
+- self_consistency_check         N sequential samples + synthesis
+- self_consistency_check_async   N concurrent samples + synthesis
+
+Every operation uses a distinct question, so the embedding and prompt
+caches never turn a measurement into a cache hit; the semantic answer
+cache (which would match the near-identical questions) is switched off.
+
+Results are printed as a table and written as JSON (with the git commit
+and server settings) for comparison.
+
+Usage:
+    python benchmark-suite.py
+    python benchmark-suite.py --corpus-sizes 6,1000,10000 --concurrency 1,8,32
+    python benchmark-suite.py --scenarios rag_query --latency 0.5 -o before.json
+
+Prerequisites:
+    pip install openai numpy
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+DEMO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(DEMO_DIR, "..", "shared"))
+from fake_azure_openai import start_server
+
+SCENARIOS = ("search_documents", "rag_query", "self_consistency_check", "self_consistency_check_async")
+
+
+def load_demo(filename: str, name: str):
+    """Import a hyphenated demo script as a module."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(DEMO_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_corpus(base: List[Dict], size: int) -> List[Dict]:
+    """size documents cycled from base, each with a unique id and text."""
+    corpus = []
+    for i in range(size):
+        doc = base[i % len(base)]
+        corpus.append(dict(doc, id=f"{doc['id']}-{i}", content=f"{doc['content']} (copy {i})"))
+    return corpus
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def run_threaded(operation: Callable[[int], object], operations: int, concurrency: int) -> List[float]:
+    """Run operation(0..operations-1) on `concurrency` threads; per-call seconds."""
+    def timed(i):
+        start = time.perf_counter()
+        operation(i)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(timed, range(operations)))
+
+
+# One event loop for every async run: the demo's AsyncAzureOpenAI client
+# pools connections on the loop that opened them, so asyncio.run() per
+# measurement would leave it holding connections of a closed loop
+_event_loop = asyncio.new_event_loop()
+
+
+def run_async(operation: Callable[[int], object], operations: int, concurrency: int) -> List[float]:
+    """Run async operation(0..operations-1), at most `concurrency` at once."""
+    async def run_all():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(i):
+            async with semaphore:
+                start = time.perf_counter()
+                await operation(i)
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(timed(i) for i in range(operations)))
+
+    return list(_event_loop.run_until_complete(run_all()))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=DEMO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the hour 5 demos against a local fake Azure OpenAI.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--corpus-sizes", default="6,1000,5000", help="Documents in the RAG knowledge base")
+    parser.add_argument("--concurrency", default="1,4,16", help="Operations in flight")
+    parser.add_argument("--operations", type=int, default=32, help="Operations per measurement")
+    parser.add_argument("--samples", type=int, default=3, help="Self-consistency samples")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake server seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--completion-tokens", type=int, default=40)
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    corpus_sizes = [int(n) for n in args.corpus_sizes.split(",")]
+    concurrency_levels = [int(n) for n in args.concurrency.split(",")]
+
+    server = start_server(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                          completion_tokens=args.completion_tokens)
+    workdir = tempfile.mkdtemp(prefix="ai900-bench-")
+    os.environ.update({
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{server.server_port}",
+        "AZURE_OPENAI_KEY": "benchmark",
+        "RAG_INDEX_DIR": os.path.join(workdir, "rag-index"),
+        "PROMPT_CACHE_DIR": os.path.join(workdir, "prompt-cache"),
+    })
+    # Client-side throttling would measure our quota settings, not the code
+    os.environ.setdefault("AZURE_OPENAI_TPM", "100000000")
+    # The questions differ only by a run number, which the lexical embedder
+    # scores above the semantic cache threshold: keep that cache out of it
+    os.environ["RAG_SEMANTIC_CACHE_THRESHOLD"] = "2"
+
+    print("🏁 Hour 5 Benchmark Suite")
+    print("=" * 60)
+    print(f"Fake Azure OpenAI on port {server.server_port}: latency {args.latency}s, "
+          f"{args.tokens_per_second:.0f} tokens/s, {args.completion_tokens} tokens per answer")
+
+    results = []
+    with open(os.devnull, "w") as devnull:
+        with contextlib.redirect_stdout(devnull):  # the demos narrate every call
+            rag = load_demo("rag-pattern-demo.py", "rag_pattern_demo")
+            prompts = load_demo("advanced-prompt-engineering.py", "advanced_prompt_engineering")
+        base_corpus = list(rag.KNOWLEDGE_BASE)
+
+        def record(scenario, corpus_size, concurrency, latencies, elapsed):
+            row = {
+                "scenario": scenario,
+                "corpus_size": corpus_size,
+                "concurrency": concurrency,
+                "operations": len(latencies),
+                "seconds": round(elapsed, 4),
+                "throughput_per_second": round(len(latencies) / elapsed, 2),
+                "mean_ms": round(1000 * sum(latencies) / len(latencies), 2),
+                "p50_ms": round(1000 * percentile(latencies, 50), 2),
+                "p95_ms": round(1000 * percentile(latencies, 95), 2),
+            }
+            results.append(row)
+            print(f"{scenario:<30} {corpus_size or '-':>7} {concurrency:>5} {row['throughput_per_second']:>9.2f} "
+                  f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f}")
+
+        print(f"\n{'scenario':<30} {'corpus':>7} {'conc':>5} {'ops/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+        run_id = 0
+        retrieval = [s for s in scenarios if s in ("search_documents", "rag_query")]
+        for corpus_size in corpus_sizes if retrieval else []:
+            with contextlib.redirect_stdout(devnull):
+                rag.update_knowledge_base(synthetic_corpus(base_corpus, corpus_size))
+                rag.search_documents("warm up")  # build the indexes outside the timing
+            for scenario in retrieval:
+                function = getattr(rag, scenario)
+                for concurrency in concurrency_levels:
+                    run_id += 1
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(devnull):
+                        latencies = run_threaded(
+                            lambda i: function(f"What does Azure offer for AI workloads? (run {run_id}.{i})"),
+                            args.operations, concurrency)
+                    record(scenario, corpus_size, concurrency, latencies, time.perf_counter() - start)
+
+        for scenario in scenarios:
+            if not scenario.startswith("self_consistency"):
+                continue
+            function = getattr(prompts, scenario)
+            runner = run_async if scenario.endswith("_async") else run_threaded
+            for concurrency in concurrency_levels:
+                run_id += 1
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):
+                    latencies = runner(
+                        lambda i: function(f"Why use managed AI services? (run {run_id}.{i})", num_samples=args.samples),
+                        args.operations, concurrency)
+                record(scenario, None, concurrency, latencies, time.perf_counter() - start)
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "server": {"latency": args.latency, "tokens_per_second": args.tokens_per_second,
+                   "completion_tokens": args.completion_tokens},
+        "operations": args.operations,
+        "self_consistency_samples": args.samples,
+        "requests_served": server.requests_served,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    server.shutdown()
+    print(f"\n💾 Results written to {args.output} (commit {report['commit']})")
+
+
+if __name__ == "__main__":
+    main()
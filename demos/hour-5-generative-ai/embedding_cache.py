@@ -0,0 +1,134 @@
+"""
+Embedding Cache for the RAG Pattern Demo
+========================================
+
+Remembers embeddings by a hash of their content, so the same text never
+costs a second call to the embeddings API.
+
+Two tiers:
+- Memory: a bounded LRU (OrderedDict) of the most recently used vectors
+- Disk: a SQLite table of float32 blobs that survives restarts; memory
+  evictions are still served from here
+
+Hit/miss counters show how many embedding calls the cache saved.
+
+Prerequisites:
+    pip install numpy
+"""
+
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+def content_key(text: str, model: str = "") -> str:
+    """SHA-256 of model + text; the model is included so switching it misses."""
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of embedding vectors.
+
+    Args:
+        max_items: Maximum vectors kept in memory before LRU eviction
+        path: SQLite file for the persistent tier (None = memory only)
+        model: Embedding model name mixed into every key
+    """
+
+    def __init__(self, max_items: int = 10_000, path: Optional[str] = None, model: str = ""):
+        self.max_items = max_items
+        self.model = model
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                             "(key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._db.commit()
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached vector for text, or None (counted as a miss)."""
+        key = content_key(text, self.model)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+            if self._db is not None:
+                row = self._db.execute("SELECT vector FROM embeddings WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None:
+                    vector = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vector)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector) -> np.ndarray:
+        """Store a vector in both tiers and return it as float32."""
+        return self.put_many([text], [vector])[0]
+
+    def put_many(self, texts: List[str], vectors) -> List[np.ndarray]:
+        """
+        Store one vector per text in both tiers, writing the disk tier in
+        a single transaction (one commit per batch, not per vector).
+        Returns the vectors as float32.
+        """
+        stored = []
+        for vector in vectors:
+            vector = np.asarray(vector, dtype=np.float32)
+            vector.setflags(write=False)  # shared by every caller that hits
+            stored.append(vector)
+        keys = [content_key(text, self.model) for text in texts]
+        with self._lock:
+            for key, vector in zip(keys, stored):
+                self._remember(key, vector)
+            if self._db is not None:
+                self._db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                     [(key, vector.tobytes()) for key, vector in zip(keys, stored)])
+                self._db.commit()
+        return stored
+
+    def get_or_compute(self, text: str, compute: Callable[[str], object]) -> np.ndarray:
+        """Return the cached vector, calling compute(text) only on a miss."""
+        vector = self.get(text)
+        if vector is None:
+            vector = self.put(text, compute(text))
+        return vector
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters; every hit is one embedding call saved."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "calls_saved": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,156 @@
+"""
+Offline Feature-Hashing Embeddings for the RAG Pattern Demo
+===========================================================
+
+A deterministic, network-free stand-in for an embedding model, so the
+demo retrieves sensibly without an embeddings deployment.
+
+Each text becomes a bag of features, every feature is hashed (CRC-32,
+stable across processes and machines) into one of `dimensions` buckets
+with a +/-1 sign, and the bucket sums form the vector:
+
+- Words (lowercased \\w+ tokens, minus a short list of stop words)
+- Character n-grams of each word ("<azure>" -> "<az", "azu", ...), so
+  related word forms ("embedding" / "embeddings") share features
+- Word bigrams, for a little word-order information
+
+Counts are damped (log1p) and rows are L2-normalized, so the dot product
+is a cosine similarity like with model embeddings. It is lexical, not
+semantic: paraphrases with different words won't match.
+
+Speed: each distinct word's features are hashed once and kept in flat
+arrays; embedding a batch is then a dictionary lookup per token plus a
+few vectorized NumPy gathers and one bincount for the whole batch.
+
+Prerequisites:
+    pip install numpy
+"""
+
+import re
+import threading
+import zlib
+from itertools import chain
+import numpy as np
+from typing import Sequence
+
+from rag_index import normalize_rows
+
+TOKEN_PATTERN = re.compile(r"\w+")
+# Function words carry no topic and would otherwise dominate short queries
+STOP_WORDS = frozenset("""
+a an and are as at be by can do does for from how in is it its of on or
+that the their this to was what when where which who why will with you your
+""".split())
+# CRC-32 start values, so words, n-grams and bigrams hash independently
+CHAR_SEED = 0x9E3779B9
+BIGRAM_MULTIPLIER = 1_000_003
+WORD_WEIGHT = 1.0
+CHAR_WEIGHT = 1.0  # total for one word's n-grams, spread evenly
+BIGRAM_WEIGHT = 0.5
+
+
+def _signed_bucket(h: int, dimensions: int):
+    """Bucket from the low bits, sign from the top bit of a 32-bit hash."""
+    return h % dimensions, (-1.0 if h & 0x80000000 else 1.0)
+
+
+class HashingEmbedder:
+    """
+    Feature-hashing text embedder.
+
+    Args:
+        dimensions: Output vector length
+        char_ngrams: (min, max) character n-gram sizes; None = words only
+        bigrams: Also hash consecutive word pairs
+    """
+
+    def __init__(self, dimensions: int = 384, char_ngrams=(3, 5), bigrams: bool = True):
+        self.dimensions = dimensions
+        self.char_ngrams = char_ngrams
+        self.bigrams = bigrams
+        self._lock = threading.Lock()
+        self._vocab = {}
+        # Per word id: 32-bit word hash and a slice [offsets[i], offsets[i+1])
+        # of the flat feature arrays (bucket, signed weight)
+        self._word_hashes = np.zeros(1024, dtype=np.int64)
+        self._offsets = np.zeros(1025, dtype=np.int64)
+        self._buckets = np.zeros(16_384, dtype=np.int64)
+        self._weights = np.zeros(16_384, dtype=np.float32)
+
+    def _word_features(self, word: str):
+        data = word.encode("utf-8")
+        h = zlib.crc32(data)
+        features = [_signed_bucket(h, self.dimensions) + (WORD_WEIGHT,)]
+        if self.char_ngrams:
+            marked = f"<{word}>".encode("utf-8")
+            low, high = self.char_ngrams
+            grams = [marked[i:i + n] for n in range(low, high + 1) for i in range(len(marked) - n + 1)]
+            weight = CHAR_WEIGHT / np.sqrt(len(grams)) if grams else 0.0
+            features += [_signed_bucket(zlib.crc32(g, CHAR_SEED), self.dimensions) + (weight,) for g in grams]
+        return h, features
+
+    def _add_word(self, word: str) -> int:
+        """Assign the next id to word and append its features (caller holds the lock)."""
+        word_id = len(self._vocab)
+        h, features = self._word_features(word)
+        start = self._offsets[word_id]
+        end = start + len(features)
+
+        if word_id + 1 >= len(self._word_hashes):
+            self._word_hashes = np.resize(self._word_hashes, 2 * len(self._word_hashes))
+            self._offsets = np.resize(self._offsets, 2 * len(self._offsets))
+        if end > len(self._buckets):
+            size = max(end, 2 * len(self._buckets))
+            self._buckets = np.resize(self._buckets, size)
+            self._weights = np.resize(self._weights, size)
+
+        self._word_hashes[word_id] = h
+        self._buckets[start:end] = [bucket for bucket, _, _ in features]
+        self._weights[start:end] = [sign * weight for _, sign, weight in features]
+        self._offsets[word_id + 1] = end
+        self._vocab[word] = word_id
+        return word_id
+
+    def _word_ids(self, tokens):
+        ids = list(map(self._vocab.get, tokens))
+        if None in ids:
+            with self._lock:
+                for i, word_id in enumerate(ids):
+                    if word_id is None:
+                        word_id = self._vocab.get(tokens[i])
+                        ids[i] = self._add_word(tokens[i]) if word_id is None else word_id
+        return ids
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """One unit-length float32 row per text (all zeros for a text without words)."""
+        token_lists = [[token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+                       for text in texts]
+        ids = np.array(self._word_ids(list(chain.from_iterable(token_lists))), dtype=np.int64)
+        # Snapshot: arrays are only ever replaced or appended to
+        with self._lock:
+            offsets, buckets, weights = self._offsets, self._buckets, self._weights
+            word_hashes = self._word_hashes
+        rows = np.repeat(np.arange(len(texts)), [len(tokens) for tokens in token_lists])
+
+        # Gather every token's (bucket, weight) features from the flat arrays
+        starts = offsets[ids]
+        counts = offsets[ids + 1] - starts
+        feature_rows = np.repeat(rows, counts)
+        first = np.cumsum(counts) - counts
+        positions = np.repeat(starts - first, counts) + np.arange(counts.sum())
+        feature_buckets = buckets[positions]
+        feature_weights = weights[positions]
+
+        if self.bigrams and len(ids) > 1:
+            same_text = rows[1:] == rows[:-1]
+            h = word_hashes[ids[:-1][same_text]] * BIGRAM_MULTIPLIER ^ word_hashes[ids[1:][same_text]]
+            h &= 0xFFFFFFFF
+            feature_rows = np.concatenate([feature_rows, rows[1:][same_text]])
+            feature_buckets = np.concatenate([feature_buckets, h % self.dimensions])
+            feature_weights = np.concatenate([
+                feature_weights, np.where(h & 0x80000000, -BIGRAM_WEIGHT, BIGRAM_WEIGHT)])
+
+        totals = np.bincount(feature_rows * self.dimensions + feature_buckets,
+                             weights=feature_weights, minlength=len(texts) * self.dimensions)
+        matrix = totals.reshape(len(texts), self.dimensions)
+        return normalize_rows(np.sign(matrix) * np.log1p(np.abs(matrix)))
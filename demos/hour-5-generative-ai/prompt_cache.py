@@ -0,0 +1,182 @@
+"""
+Prompt/Response Cache for the Prompt Engineering Demos
+======================================================
+
+Re-running a demo sends exactly the same requests again. This cache
+keys each chat completion on a canonical hash of the full request
+(model, messages, temperature, seed, response_format and every other
+parameter) and replays the stored response instead of calling the API.
+
+Two tiers:
+- Memory: a bounded LRU (OrderedDict) of response objects
+- Disk: a SQLite table of serialized responses with a time-to-live
+
+Only deterministic requests (temperature 0 or a fixed seed) are cached
+by default - a sampled answer at temperature 0.8 is supposed to vary.
+Set cache_all=True to cache everything (handy for rehearsing a demo).
+Streaming requests are never cached.
+
+Prerequisites:
+    pip install openai
+"""
+
+import contextvars
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from openai.types.chat import ChatCompletion
+
+
+def request_key(params: Dict[str, Any]) -> str:
+    """SHA-256 of the request parameters in canonical (sorted, compact) JSON."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(params: Dict[str, Any]) -> bool:
+    """Temperature 0 or a fixed seed: a repeat call should give the same answer."""
+    return params.get("temperature") == 0 or params.get("seed") is not None
+
+
+class PromptCache:
+    """
+    Two-tier (memory LRU + SQLite with TTL) cache of chat completions.
+
+    Args:
+        max_items: Maximum responses kept in memory before LRU eviction
+        path: SQLite file for the persistent tier (None = memory only)
+        ttl_seconds: Age after which a disk entry is ignored and deleted
+        cache_all: Also cache non-deterministic requests
+    """
+
+    def __init__(self, max_items: int = 1024, path: Optional[str] = None,
+                 ttl_seconds: float = 7 * 24 * 3600, cache_all: bool = False):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.cache_all = cache_all
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        # Outcome of the latest create() in this thread/task (for metrics)
+        self._status = contextvars.ContextVar(f"prompt_cache_status_{id(self)}", default=None)
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                             "(key TEXT PRIMARY KEY, created REAL NOT NULL, response TEXT NOT NULL)")
+            self._db.commit()
+
+    def _remember(self, key: str, created: float, response: ChatCompletion) -> None:
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[ChatCompletion]:
+        """Return a fresh cached response, or None (counted as a miss)."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT created, response FROM responses WHERE key = ?",
+                                       (key,)).fetchone()
+                if row is not None and now - row[0] < self.ttl_seconds:
+                    response = ChatCompletion.model_validate_json(row[1])
+                    self._remember(key, row[0], response)
+                    self.disk_hits += 1
+                    return response
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, response: ChatCompletion) -> None:
+        created = time.time()
+        with self._lock:
+            self._remember(key, created, response)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO responses (key, created, response) "
+                                 "VALUES (?, ?, ?)", (key, created, response.model_dump_json()))
+                self._db.commit()
+
+    def _cacheable(self, params: Dict[str, Any]) -> bool:
+        if params.get("stream") or not (self.cache_all or is_deterministic(params)):
+            with self._lock:
+                self.bypassed += 1
+            self._status.set("bypass")
+            return False
+        return True
+
+    def last_status(self) -> Optional[str]:
+        """"hit", "miss" or "bypass" for the latest create() in this context."""
+        return self._status.get()
+
+    def create(self, create_fn: Callable[..., ChatCompletion], **params) -> ChatCompletion:
+        """
+        Call create_fn(**params) (e.g. client.chat.completions.create)
+        unless an identical cacheable request has a stored response.
+        """
+        if not self._cacheable(params):
+            return create_fn(**params)
+        key = request_key(params)
+        response = self.get(key)
+        self._status.set("miss" if response is None else "hit")
+        if response is None:
+            response = create_fn(**params)
+            self.put(key, response)
+        return response
+
+    async def acreate(self, create_fn: Callable[..., Any], **params) -> ChatCompletion:
+        """Async version of create() for AsyncAzureOpenAI clients."""
+        if not self._cacheable(params):
+            return await create_fn(**params)
+        key = request_key(params)
+        response = self.get(key)
+        self._status.set("miss" if response is None else "hit")
+        if response is None:
+            response = await create_fn(**params)
+            self.put(key, response)
+        return response
+
+    def purge_expired(self) -> int:
+        """Delete expired disk entries; returns how many were removed."""
+        if self._db is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute("DELETE FROM responses WHERE created < ?",
+                                      (time.time() - self.ttl_seconds,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, float]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "calls_saved": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
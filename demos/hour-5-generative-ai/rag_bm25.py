@@ -0,0 +1,124 @@
+"""
+Keyword (BM25) Index and Hybrid Fusion for the RAG Pattern Demo
+===============================================================
+
+Vector search finds documents that mean the same thing; keyword search
+finds documents that use the same words (product names, error codes,
+acronyms). Production RAG runs both and fuses the rankings.
+
+How it works:
+- An inverted index maps each term to the documents that contain it
+- Postings are stored compactly in flat NumPy arrays (CSR layout):
+  term t's postings are docs[offsets[t]:offsets[t + 1]], with the
+  matching term frequencies in freqs[...]
+- A query only reads the posting lists of its own terms, never the
+  whole corpus, and scores them with Okapi BM25
+- reciprocal_rank_fusion() merges the keyword and vector rankings:
+  each document scores sum(1 / (k + rank)) over the lists it appears in
+
+Prerequisites:
+    pip install numpy
+"""
+
+import re
+import numpy as np
+from collections import Counter
+from typing import Callable, Dict, Hashable, List, Sequence, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of documents.
+
+    Args:
+        documents: The documents (dicts) in row order
+        fields: Document fields whose text is indexed
+        k1: Term-frequency saturation
+        b: Document-length normalization
+    """
+
+    def __init__(self, documents: Sequence[Dict], fields: Sequence[str] = ("title", "content"),
+                 k1: float = 1.5, b: float = 0.75):
+        self.documents = list(documents)
+        self.k1 = k1
+        self.b = b
+        self.vocabulary = {}
+
+        term_ids, doc_ids, freqs = [], [], []
+        doc_lengths = np.zeros(len(self.documents), dtype=np.float32)
+        for row, doc in enumerate(self.documents):
+            tokens = tokenize(" ".join(str(doc.get(field, "")) for field in fields))
+            doc_lengths[row] = len(tokens)
+            for term, count in Counter(tokens).items():
+                term_ids.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_ids.append(row)
+                freqs.append(count)
+
+        # Group postings by term; a stable sort keeps each list in document order
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids, kind="stable")
+        self.docs = np.asarray(doc_ids, dtype=np.int32)[order]
+        self.freqs = np.asarray(freqs, dtype=np.float32)[order]
+        doc_freq = np.bincount(term_ids, minlength=len(self.vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(doc_freq))).astype(np.int64)
+
+        n = len(self.documents)
+        self.idf = np.log(1 + (n - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+        average_length = doc_lengths.mean() if n else 1.0
+        self.length_norm = (1 - b + b * doc_lengths / max(average_length, 1e-9)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search_rows(self, query: str, top_k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 scores and row numbers of the top-k matching documents,
+        best first. Documents sharing no term with the query are omitted.
+        """
+        terms = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not terms:
+            return np.empty(0, dtype=np.float32), np.empty(0, dtype=np.int64)
+
+        rows, contributions = [], []
+        for t in sorted(terms):
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs, tf = self.docs[start:end], self.freqs[start:end]
+            rows.append(docs)
+            contributions.append(self.idf[t] * tf * (self.k1 + 1)
+                                 / (tf + self.k1 * self.length_norm[docs]))
+
+        # Sum per document over the touched postings only
+        matched, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(contributions)).astype(np.float32)
+
+        k = min(top_k, len(matched))
+        order = np.lexsort((matched, -scores))[:k]  # best score, then document order
+        return scores[order], matched[order].astype(np.int64)
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict]]:
+        """Top-k (BM25 score, document) pairs, best first."""
+        scores, rows = self.search_rows(query, top_k)
+        return [(float(score), self.documents[row]) for score, row in zip(scores, rows)]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Dict]], k: int = 60,
+                           key: Callable[[Dict], Hashable] = lambda doc: doc["id"]) -> List[Dict]:
+    """
+    Merge several best-first rankings into one.
+    Each document scores sum(1 / (k + rank)); ties keep first-seen order.
+    """
+    scores, first_seen = {}, {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, 1):
+            doc_key = key(doc)
+            scores[doc_key] = scores.get(doc_key, 0.0) + 1.0 / (k + rank)
+            first_seen.setdefault(doc_key, doc)
+    ordered = sorted(first_seen, key=lambda doc_key: -scores[doc_key])
+    return [first_seen[doc_key] for doc_key in ordered]
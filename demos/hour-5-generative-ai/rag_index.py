@@ -0,0 +1,234 @@
+"""
+In-Memory Vector Index for the RAG Pattern Demo
+===============================================
+
+Embeds the knowledge base once and keeps the vectors in memory, so a
+search no longer re-embeds every document on every query.
+
+How it works:
+- Each document embedding is L2-normalized and stacked into one
+  contiguous float32 matrix (one row per document)
+- Cosine similarity against a query is then a single matrix-vector
+  product (one BLAS call instead of N Python calls)
+- Top-k selection uses np.argpartition, so only the k winners are sorted
+- A batch of queries is scored with one matrix-matrix product
+
+Persistence:
+    save() writes the matrix as a float32 .npy file plus a small JSON
+    sidecar (id, title, category per row). load() opens the vectors
+    with np.memmap, so startup is near-instant, worker processes share
+    one page-cached copy, and the index can be larger than RAM.
+    Each save writes a new, uniquely named vectors file and then swaps
+    in the sidecar that names it, so a concurrent load always pairs
+    vectors and metadata from the same save.
+
+Prerequisites:
+    pip install numpy
+"""
+
+import glob
+import hashlib
+import json
+import os
+import uuid
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+VECTORS_FILE_PATTERN = "vectors-{}.npy"  # one per save, named in the metadata
+METADATA_FILE = "metadata.json"
+METADATA_FIELDS = ("id", "title", "category")
+
+
+def normalize_rows(vectors) -> np.ndarray:
+    """
+    Return vectors as a contiguous float32 array with unit-length rows.
+    Zero vectors are left as zeros instead of producing NaNs.
+    """
+    matrix = np.array(vectors, dtype=np.float32, copy=True, ndmin=1)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return np.ascontiguousarray(matrix)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first.
+
+    Works on a 1-D score vector or row-wise on a 2-D score matrix.
+    Ties keep document order, matching a stable sort of all scores.
+    """
+    scores = np.asarray(scores)
+    n = scores.shape[-1]
+    k = max(0, min(k, n))
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+        candidates.sort(axis=-1)  # document order, so ties stay stable
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape).copy()
+
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def corpus_fingerprint(documents: Sequence[Dict], field: str = "content",
+                       salt: str = "") -> str:
+    """
+    Content hash of a corpus, used to tell whether a saved index is stale.
+    Pass the embedding model name as salt so a model change also rebuilds.
+    """
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    for doc in documents:
+        digest.update(b"\x00" + str(doc.get("id", "")).encode("utf-8"))
+        digest.update(b"\x00" + doc[field].encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _write_atomically(path: str, write: Callable) -> None:
+    """Write to a temp file and rename, so readers never see a partial file."""
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class VectorIndex:
+    """
+    Exact cosine-similarity index over a fixed list of documents.
+
+    Args:
+        documents: The documents (dicts) in row order
+        vectors: One embedding per document, any float array-like
+        normalized: Set when vectors is already a float32 matrix of unit
+            rows (e.g. a memmap from load()) so it is used without copying
+    """
+
+    def __init__(self, documents: Sequence[Dict], vectors, normalized: bool = False):
+        self.documents = list(documents)
+        if normalized:
+            self.matrix = vectors
+        else:
+            self.matrix = normalize_rows(vectors).reshape(len(self.documents), -1)
+
+    @classmethod
+    def from_documents(cls, documents: Sequence[Dict],
+                       embed: Callable[[str], List[float]],
+                       field: str = "content") -> "VectorIndex":
+        """Embed every document once and build the index."""
+        vectors = [embed(doc[field]) for doc in documents]
+        return cls(documents, vectors)
+
+    def save(self, directory: str, fingerprint: str = "") -> None:
+        """
+        Persist the index: vectors as float32 .npy, metadata as a JSON sidecar.
+        The metadata is replaced last and names this save's vectors file;
+        vectors files of earlier saves are then removed.
+        """
+        os.makedirs(directory, exist_ok=True)
+        vectors_file = VECTORS_FILE_PATTERN.format(uuid.uuid4().hex[:12])
+        metadata = {
+            "fingerprint": fingerprint,
+            "vectors_file": vectors_file,
+            "count": len(self.documents),
+            "dimensions": self.dimensions,
+        }
+        for name in METADATA_FIELDS:
+            metadata[name + "s"] = [doc.get(name) for doc in self.documents]
+
+        _write_atomically(os.path.join(directory, vectors_file),
+                          lambda f: np.save(f, self.matrix.astype(np.float32, copy=False)))
+        _write_atomically(os.path.join(directory, METADATA_FILE),
+                          lambda f: f.write(json.dumps(metadata).encode("utf-8")))
+
+        for path in glob.glob(os.path.join(directory, VECTORS_FILE_PATTERN.format("*"))):
+            if os.path.basename(path) != vectors_file:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # e.g. still memory-mapped by a reader on Windows
+
+    @classmethod
+    def load(cls, directory: str, documents: Optional[Sequence[Dict]] = None,
+             fingerprint: Optional[str] = None) -> Optional["VectorIndex"]:
+        """
+        Open a saved index with the vectors memory-mapped read-only.
+
+        Args:
+            directory: Folder written by save()
+            documents: Full documents to attach by id (e.g. KNOWLEDGE_BASE);
+                without them each row gets its id/title/category metadata
+            fingerprint: Expected corpus fingerprint; a mismatch returns None
+
+        Returns None when no usable index is found, so callers can rebuild.
+        """
+        metadata_path = os.path.join(directory, METADATA_FILE)
+        if not os.path.exists(metadata_path):
+            return None
+
+        with open(metadata_path, encoding="utf-8") as f:
+            metadata = json.load(f)
+        if fingerprint is not None and metadata.get("fingerprint") != fingerprint:
+            return None
+        if "vectors_file" not in metadata:
+            return None  # written before vectors files were versioned
+
+        try:
+            matrix = np.load(os.path.join(directory, metadata["vectors_file"]), mmap_mode="r")
+        except FileNotFoundError:
+            return None  # replaced by a newer save since the metadata was read
+        if matrix.dtype != np.float32 or matrix.shape != (metadata["count"], metadata["dimensions"]):
+            return None
+
+        rows = [dict(zip(METADATA_FIELDS, values))
+                for values in zip(*(metadata[name + "s"] for name in METADATA_FIELDS))]
+        if documents is not None:
+            by_id = {doc["id"]: doc for doc in documents}
+            if not all(row["id"] in by_id for row in rows):
+                return None
+            rows = [by_id[row["id"]] for row in rows]
+
+        return cls(rows, matrix, normalized=True)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def dimensions(self) -> int:
+        return self.matrix.shape[1]
+
+    def search(self, query_vector, top_k: int = 3) -> List[Tuple[float, Dict]]:
+        """
+        Score every document against the query and return the top-k
+        (similarity, document) pairs, best first.
+        """
+        query = normalize_rows(query_vector)
+        scores = self.matrix @ query
+        rows = top_k_indices(scores, top_k)
+        return self._results(scores[rows], rows)
+
+    def search_rows(self, query_vectors, top_k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k similarities and row numbers for a batch of queries, as two
+        (queries x k) arrays, scored with one matrix-matrix product.
+        """
+        queries = normalize_rows(query_vectors).reshape(-1, self.dimensions)
+        scores = queries @ self.matrix.T
+        rows = top_k_indices(scores, top_k)
+        return np.take_along_axis(scores, rows, axis=-1), rows
+
+    def search_batch(self, query_vectors, top_k: int = 3) -> List[List[Tuple[float, Dict]]]:
+        """
+        Search a batch of queries at once.
+        Returns one top-k list per query, ranked the same way as search().
+        """
+        scores, rows = self.search_rows(query_vectors, top_k)
+        return [self._results(row_scores, row) for row_scores, row in zip(scores, rows)]
+
+    def _results(self, scores, rows) -> List[Tuple[float, Dict]]:
+        """Pair scores with documents; negative rows mark empty slots."""
+        return [(float(score), self.documents[row])
+                for score, row in zip(scores, rows) if row >= 0]
@@ -0,0 +1,312 @@
+"""
+Streaming Document Ingestion for the RAG Pattern Demo
+=====================================================
+
+Real knowledge bases are files, not a hand-written list of dicts, and
+they can be far bigger than memory. This module ingests text files
+through a generator pipeline:
+
+    read_pieces -> iter_words -> iter_chunks -> embed in batches -> ChunkStore
+
+- Files are read in fixed-size pieces, never whole
+- Text is split into overlapping, token-bounded chunks (so a sentence
+  cut at a chunk edge still appears intact in the neighbour)
+- Chunks are embedded a batch at a time and appended to disk
+- A manifest remembers each file's size, mtime and SHA-256; re-ingesting
+  only re-chunks and re-embeds files whose content changed
+
+ChunkStore layout (one directory):
+    vectors.f32   - raw float32 unit vectors, appended row by row
+    chunks.jsonl  - one line per row: id, title, category, source, content
+    manifest.json - dimensions, committed row count, per-file hashes/rows
+
+Prerequisites:
+    pip install numpy tiktoken  (without tiktoken, tokens are approximated)
+"""
+
+import functools
+import hashlib
+import json
+import os
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from rag_index import VectorIndex, normalize_rows
+from token_budget import count_tokens, truncate_tokens
+
+PIECE_SIZE = 64 * 1024  # characters read per step
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_pieces(path: str, piece_size: int = PIECE_SIZE) -> Iterator[str]:
+    """Yield a text file in pieces of at most piece_size characters."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for piece in iter(lambda: f.read(piece_size), ""):
+            yield piece
+
+
+def iter_words(pieces: Iterable[str]) -> Iterator[str]:
+    """Yield whitespace-separated words, rejoining words split across pieces."""
+    carry = ""
+    for piece in pieces:
+        text = carry + piece
+        words = text.split()
+        carry = words.pop() if words and not text[-1].isspace() else ""
+        yield from words
+    if carry:
+        yield carry
+
+
+@functools.lru_cache(maxsize=65536)
+def word_tokens(word: str, model: str = "") -> int:
+    """Tokens a word costs inside running text (with its leading space)."""
+    return count_tokens(" " + word, model)
+
+
+def iter_chunks(words: Iterable[str], max_tokens: int = 200, overlap: int = 40,
+                model: str = "") -> Iterator[str]:
+    """
+    Group words into chunks of at most max_tokens tokens (counted with
+    token_budget.count_tokens, so they fit the same budgets as the
+    prompt), each starting with up to `overlap` tokens of words from the
+    end of the previous chunk. A single word longer than max_tokens is
+    truncated to fit.
+    """
+    if not 0 <= overlap < max_tokens:
+        raise ValueError("overlap must be between 0 and max_tokens - 1")
+    window = deque()  # (word, tokens)
+    used, fresh = 0, 0
+    for word in words:
+        cost = word_tokens(word, model)
+        if cost > max_tokens:
+            word, cost = truncate_tokens(word, max_tokens - 1, model), max_tokens
+        if used + cost > max_tokens:
+            yield " ".join(w for w, _ in window)
+            # Keep the tail as overlap, leaving room for this word
+            while window and (used > overlap or used + cost > max_tokens):
+                used -= window.popleft()[1]
+            fresh = 0
+        window.append((word, cost))
+        used += cost
+        fresh += 1
+    if fresh:
+        yield " ".join(w for w, _ in window)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Yield lists of up to size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ChunkStore:
+    """
+    Append-only on-disk store of chunk vectors and chunk text.
+
+    Rows of a changed or removed file are tombstoned and dropped by
+    compact(); rows written after the last committed manifest (e.g. a
+    crash mid-file) are truncated away when the store is opened.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    CHUNKS_FILE = "chunks.jsonl"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = {"dimensions": None, "rows": 0, "chunk_bytes": 0,
+                         "files": {}, "deleted": []}
+        manifest_path = self._path(self.MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        self._truncate_to_manifest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _truncate_to_manifest(self) -> None:
+        dims = self.manifest["dimensions"] or 0
+        for name, size in ((self.VECTORS_FILE, self.manifest["rows"] * dims * 4),
+                           (self.CHUNKS_FILE, self.manifest["chunk_bytes"])):
+            with open(self._path(name), "ab") as f:
+                f.truncate(size)
+
+    def _commit(self) -> None:
+        tmp_path = self._path(self.MANIFEST_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self._path(self.MANIFEST_FILE))
+
+    def is_current(self, source: str, content_hash: str) -> bool:
+        entry = self.manifest["files"].get(source)
+        return entry is not None and entry["hash"] == content_hash
+
+    def is_unmodified(self, source: str, file_stat: os.stat_result) -> bool:
+        """Same size and mtime as when source was last ingested (no read needed)."""
+        entry = self.manifest["files"].get(source)
+        return (entry is not None and entry.get("size") == file_stat.st_size
+                and entry.get("mtime_ns") == file_stat.st_mtime_ns)
+
+    def touch(self, source: str, file_stat: os.stat_result) -> None:
+        """Record the current size and mtime of an unchanged source."""
+        self.manifest["files"][source].update(size=file_stat.st_size, mtime_ns=file_stat.st_mtime_ns)
+        self._commit()
+
+    def sources(self) -> set:
+        return set(self.manifest["files"])
+
+    def remove(self, source: str) -> None:
+        """Tombstone every row that came from source."""
+        entry = self.manifest["files"].pop(source, None)
+        if entry and entry["end"] > entry["start"]:
+            self.manifest["deleted"].append([entry["start"], entry["end"]])
+        self._commit()
+
+    def append_file(self, source: str, content_hash: str,
+                    batches: Iterable[List[Dict]], vectors_for: Callable[[List[str]], np.ndarray],
+                    file_stat: Optional[os.stat_result] = None) -> int:
+        """
+        Append a file's chunks batch by batch and commit the file once all
+        its rows are written. Returns the number of chunks added.
+        """
+        if source in self.manifest["files"]:
+            self.remove(source)
+
+        start = self.manifest["rows"]
+        rows, chunk_bytes = start, self.manifest["chunk_bytes"]
+        with open(self._path(self.VECTORS_FILE), "ab") as vectors_file, \
+                open(self._path(self.CHUNKS_FILE), "ab") as chunks_file:
+            for batch in batches:
+                vectors = normalize_rows(vectors_for([chunk["content"] for chunk in batch]))
+                if self.manifest["dimensions"] is None:
+                    self.manifest["dimensions"] = vectors.shape[1]
+                elif vectors.shape[1] != self.manifest["dimensions"]:
+                    raise ValueError(f"Expected {self.manifest['dimensions']}-dim vectors, "
+                                     f"got {vectors.shape[1]}")
+                vectors_file.write(vectors.tobytes())
+                for chunk in batch:
+                    line = (json.dumps(chunk) + "\n").encode("utf-8")
+                    chunks_file.write(line)
+                    chunk_bytes += len(line)
+                rows += len(batch)
+
+        self.manifest["rows"] = rows
+        self.manifest["chunk_bytes"] = chunk_bytes
+        entry = {"hash": content_hash, "start": start, "end": rows}
+        if file_stat is not None:
+            entry.update(size=file_stat.st_size, mtime_ns=file_stat.st_mtime_ns)
+        self.manifest["files"][source] = entry
+        self._commit()
+        return rows - start
+
+    def compact(self) -> None:
+        """Rewrite the store without tombstoned rows, streaming row by row."""
+        if not self.manifest["deleted"]:
+            return
+        live = np.ones(self.manifest["rows"], dtype=bool)
+        for start, end in self.manifest["deleted"]:
+            live[start:end] = False
+        new_row = np.cumsum(live) - 1  # new position of every live row
+
+        vectors = self._open_vectors()
+        rows, chunk_bytes = 0, 0
+        with open(self._path(self.VECTORS_FILE + ".tmp"), "wb") as vectors_out, \
+                open(self._path(self.CHUNKS_FILE + ".tmp"), "wb") as chunks_out, \
+                open(self._path(self.CHUNKS_FILE), "rb") as chunks_in:
+            for row, line in zip(range(self.manifest["rows"]), chunks_in):
+                if live[row]:
+                    vectors_out.write(np.asarray(vectors[row], dtype=np.float32).tobytes())
+                    chunks_out.write(line)
+                    rows += 1
+                    chunk_bytes += len(line)
+        del vectors
+        os.replace(self._path(self.VECTORS_FILE + ".tmp"), self._path(self.VECTORS_FILE))
+        os.replace(self._path(self.CHUNKS_FILE + ".tmp"), self._path(self.CHUNKS_FILE))
+
+        for entry in self.manifest["files"].values():
+            first, count = entry["start"], entry["end"] - entry["start"]
+            entry["start"] = int(new_row[first]) if count else rows
+            entry["end"] = entry["start"] + count
+        self.manifest.update(rows=rows, chunk_bytes=chunk_bytes, deleted=[])
+        self._commit()
+
+    def _open_vectors(self) -> np.ndarray:
+        dims = self.manifest["dimensions"] or 0
+        if not self.manifest["rows"]:
+            return np.empty((0, dims), dtype=np.float32)
+        return np.memmap(self._path(self.VECTORS_FILE), dtype=np.float32, mode="r",
+                         shape=(self.manifest["rows"], dims))
+
+    def to_index(self) -> VectorIndex:
+        """Compact if needed, then open the vectors memory-mapped as a VectorIndex."""
+        self.compact()
+        with open(self._path(self.CHUNKS_FILE), encoding="utf-8") as f:
+            chunks = [json.loads(line) for _, line in zip(range(self.manifest["rows"]), f)]
+        return VectorIndex(chunks, self._open_vectors(), normalized=True)
+
+
+def ingest_files(paths: Iterable[str], store: ChunkStore,
+                 embed_batch: Callable[[List[str]], np.ndarray],
+                 batch_size: int = 64, max_tokens: int = 200, overlap: int = 40,
+                 category: str = "ingested", prune: bool = False, model: str = "") -> Dict[str, int]:
+    """
+    Stream files into the store. A file whose size and modification time
+    match the manifest is skipped without being read; otherwise it is
+    hashed, and only re-chunked if its SHA-256 changed.
+
+    With prune=True, paths is the whole corpus: files ingested earlier
+    but missing from paths are tombstoned (compact() reclaims the space).
+
+    Chunk sizes are in tokens of model's encoding (see iter_chunks).
+
+    Returns counts of files ingested/skipped/removed and chunks added.
+    """
+    stats = {"files_ingested": 0, "files_skipped": 0, "files_removed": 0, "chunks_added": 0}
+    seen = set()
+    for path in paths:
+        source = os.path.abspath(path)
+        seen.add(source)
+        file_stat = os.stat(path)
+        if store.is_unmodified(source, file_stat):
+            stats["files_skipped"] += 1
+            continue
+        content_hash = file_sha256(path)
+        if store.is_current(source, content_hash):
+            store.touch(source, file_stat)  # e.g. copied or touched, same bytes
+            stats["files_skipped"] += 1
+            continue
+
+        title = os.path.basename(path)
+        # Same-named files in different directories need distinct ids
+        id_prefix = f"{title}@{hashlib.sha256(source.encode('utf-8')).hexdigest()[:8]}"
+        chunks = ({"id": f"{id_prefix}#{n}", "title": title, "category": category,
+                   "source": source, "content": text}
+                  for n, text in enumerate(iter_chunks(iter_words(read_pieces(path)),
+                                                       max_tokens, overlap, model)))
+        stats["chunks_added"] += store.append_file(source, content_hash,
+                                                   batched(chunks, batch_size), embed_batch,
+                                                   file_stat)
+        stats["files_ingested"] += 1
+
+    if prune:
+        for source in store.sources() - seen:
+            store.remove(source)
+            stats["files_removed"] += 1
+    return stats
@@ -0,0 +1,250 @@
+"""
+Quantized Vector Storage for the RAG Pattern Demo
+=================================================
+
+A 1536-dim embedding stored as float32 takes 6 KB per chunk (and about
+8x that as a Python list). Quantization keeps a compressed code per
+vector and scores queries directly against the codes:
+
+- Int8Index: each vector scaled into int8 with one float32 scale per
+  vector (~4x smaller than float32)
+- PQIndex: product quantization - the vector is split into m sub-vectors
+  and each is replaced by the id (one byte) of its nearest k-means
+  centroid, so a vector costs m bytes (16x smaller with m = d / 4).
+  Queries are scored with a per-query lookup table (asymmetric distance)
+
+Both can re-rank the top candidates exactly against the full-precision
+vectors, which recovers most of the recall lost to compression while
+only reading a handful of float rows per query. Those vectors must be
+the memory-mapped store from rag_index (VectorIndex.load, ChunkStore):
+float32 rows held in RAM would cost more than the codes save, so
+from_index() only keeps a memory-mapped matrix, and memory_bytes()
+counts any in-RAM rerank vectors passed explicitly. Run this file for
+a memory/recall report.
+
+Prerequisites:
+    pip install numpy
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from rag_index import VectorIndex, normalize_rows, top_k_indices
+
+# Rows decoded per block while scoring, to bound temporary memory
+SCORE_BLOCK_ROWS = 65_536
+
+
+def is_memory_mapped(matrix) -> bool:
+    """True when matrix is (a view of) a file-backed np.memmap."""
+    while matrix is not None:
+        if isinstance(matrix, np.memmap):
+            return True
+        matrix = getattr(matrix, "base", None)
+    return False
+
+
+class QuantizedIndex(ABC):
+    """
+    Shared search logic for compressed indexes (same interface as VectorIndex).
+
+    Args:
+        documents: The documents (dicts) in row order
+        rerank_vectors: Optional full-precision unit vectors for re-ranking
+        rerank: Candidates re-scored exactly per query (0 = no re-rank)
+    """
+
+    def __init__(self, documents: Sequence[Dict], dimensions: int,
+                 rerank_vectors: Optional[np.ndarray] = None, rerank: int = 0):
+        self.documents = list(documents)
+        self.dimensions = dimensions
+        self.rerank_vectors = rerank_vectors
+        self.rerank = rerank
+
+    @classmethod
+    def from_index(cls, index: VectorIndex, **options) -> "QuantizedIndex":
+        """
+        Compress an exact index. A memory-mapped matrix is kept as the
+        rerank source; one held in RAM is not (re-ranking is then off
+        unless rerank_vectors is passed explicitly).
+        """
+        if is_memory_mapped(index.matrix):
+            options.setdefault("rerank_vectors", index.matrix)
+        return cls(index.documents, index.matrix, **options)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @abstractmethod
+    def approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """(queries x documents) similarities computed from the codes."""
+
+    @abstractmethod
+    def memory_bytes(self) -> int:
+        """Bytes held in RAM: the codes, their side data and rerank_memory_bytes()."""
+
+    def rerank_memory_bytes(self) -> int:
+        """RAM held by the rerank vectors (none when memory-mapped)."""
+        if self.rerank_vectors is None or is_memory_mapped(self.rerank_vectors):
+            return 0
+        return self.rerank_vectors.nbytes
+
+    def search_rows(self, query_vectors, top_k: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize_rows(query_vectors).reshape(-1, self.dimensions)
+        scores = self.approximate_scores(queries)
+        if self.rerank_vectors is None or self.rerank <= 0:
+            rows = top_k_indices(scores, top_k)
+            return np.take_along_axis(scores, rows, axis=-1), rows
+
+        # Re-score the best approximate candidates with the exact vectors
+        candidates = top_k_indices(scores, max(top_k, self.rerank))
+        exact = np.stack([np.asarray(self.rerank_vectors[np.sort(rows)]) @ query
+                          for rows, query in zip(candidates, queries)])
+        candidates = np.sort(candidates, axis=-1)  # same order as the rows just scored
+        best = top_k_indices(exact, top_k)
+        return np.take_along_axis(exact, best, axis=-1), np.take_along_axis(candidates, best, axis=-1)
+
+    def search(self, query_vector, top_k: int = 3) -> List[Tuple[float, Dict]]:
+        scores, rows = self.search_rows(query_vector, top_k)
+        return self._results(scores[0], rows[0])
+
+    def search_batch(self, query_vectors, top_k: int = 3) -> List[List[Tuple[float, Dict]]]:
+        scores, rows = self.search_rows(query_vectors, top_k)
+        return [self._results(row_scores, row) for row_scores, row in zip(scores, rows)]
+
+    def _results(self, scores, rows) -> List[Tuple[float, Dict]]:
+        return [(float(score), self.documents[row]) for score, row in zip(scores, rows)]
+
+
+class Int8Index(QuantizedIndex):
+    """Scalar int8 quantization with a float32 scale per vector."""
+
+    def __init__(self, documents: Sequence[Dict], vectors, **options):
+        vectors = normalize_rows(vectors).reshape(len(documents), -1)
+        super().__init__(documents, vectors.shape[1], **options)
+        self.scales = np.abs(vectors).max(axis=1) / 127.0
+        self.scales[self.scales == 0] = 1.0
+        self.codes = np.round(vectors / self.scales[:, None]).astype(np.int8)
+
+    def approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        scores = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = self.codes[start:start + SCORE_BLOCK_ROWS].astype(np.float32)
+            scores[:, start:start + len(block)] = (queries @ block.T) * self.scales[start:start + len(block)]
+        return scores
+
+    def memory_bytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.rerank_memory_bytes()
+
+
+def kmeans(matrix: np.ndarray, n_clusters: int, iterations: int = 15,
+           seed: int = 0) -> np.ndarray:
+    """Plain (Euclidean) k-means; returns the centroids."""
+    rng = np.random.default_rng(seed)
+    n_clusters = min(n_clusters, len(matrix))
+    centroids = matrix[rng.choice(len(matrix), n_clusters, replace=False)].copy()
+    for _ in range(iterations):
+        labels = nearest_centroids(matrix, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_clusters)
+        filled = np.flatnonzero(counts)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[filled]
+        sums = np.add.reduceat(matrix[order], starts, axis=0)
+        centroids[filled] = sums / counts[filled, None]
+    return centroids
+
+
+def nearest_centroids(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the nearest centroid (Euclidean) for every row."""
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2, and |x|^2 doesn't change the argmin
+    return np.argmin((centroids ** 2).sum(axis=1) - 2 * matrix @ centroids.T, axis=1)
+
+
+class PQIndex(QuantizedIndex):
+    """
+    Product quantization: m sub-vectors, 256 centroids each, 1 byte per sub-vector.
+
+    Args:
+        documents: The documents (dicts) in row order
+        vectors: One embedding per document
+        m: Number of sub-vectors (must divide the dimensions; default d / 4)
+        train_size: Rows sampled to train the codebooks
+    """
+
+    def __init__(self, documents: Sequence[Dict], vectors, m: Optional[int] = None,
+                 train_size: int = 10_000, iterations: int = 15, seed: int = 0, **options):
+        vectors = normalize_rows(vectors).reshape(len(documents), -1)
+        super().__init__(documents, vectors.shape[1], **options)
+        self.m = m or max(1, self.dimensions // 4)
+        if self.dimensions % self.m:
+            raise ValueError(f"m={self.m} must divide the {self.dimensions} dimensions")
+        sub = self.dimensions // self.m
+
+        rng = np.random.default_rng(seed)
+        training = vectors
+        if len(vectors) > train_size:
+            training = vectors[rng.choice(len(vectors), train_size, replace=False)]
+
+        self.codebooks = np.stack([
+            self._pad(kmeans(training[:, j * sub:(j + 1) * sub], 256, iterations, seed + j))
+            for j in range(self.m)
+        ])  # m x 256 x sub
+        self.codes = np.empty((len(vectors), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            for start in range(0, len(vectors), SCORE_BLOCK_ROWS):
+                block = vectors[start:start + SCORE_BLOCK_ROWS, j * sub:(j + 1) * sub]
+                self.codes[start:start + len(block), j] = nearest_centroids(block, self.codebooks[j])
+
+    @staticmethod
+    def _pad(centroids: np.ndarray) -> np.ndarray:
+        """Small corpora yield fewer than 256 centroids; pad with duplicates."""
+        padded = np.repeat(centroids[:1], 256, axis=0)
+        padded[:len(centroids)] = centroids
+        return padded
+
+    def approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        sub = self.dimensions // self.m
+        # Lookup table: similarity of each query sub-vector to each centroid
+        tables = np.einsum("qjs,jcs->qjc", queries.reshape(len(queries), self.m, sub), self.codebooks)
+        scores = np.empty((len(queries), len(self.codes)), dtype=np.float32)
+        columns = np.arange(self.m)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            block = self.codes[start:start + SCORE_BLOCK_ROWS]
+            for q, table in enumerate(tables):
+                scores[q, start:start + len(block)] = table[columns, block].sum(axis=1)
+        return scores
+
+    def memory_bytes(self) -> int:
+        return self.codes.nbytes + self.codebooks.nbytes + self.rerank_memory_bytes()
+
+
+if __name__ == "__main__":
+    import tempfile
+    from rag_ann import recall_at_k
+
+    # Synthetic clustered corpus, since real embeddings have topical structure
+    rng = np.random.default_rng(7)
+    dims, docs, topics = 384, 20_000, 100
+    centers = rng.standard_normal((topics, dims)).astype(np.float32)
+    vectors = centers[rng.integers(topics, size=docs)] + 0.8 * rng.standard_normal((docs, dims)).astype(np.float32)
+    queries = vectors[rng.choice(docs, 100, replace=False)] + 0.3 * rng.standard_normal((100, dims)).astype(np.float32)
+
+    exact = VectorIndex([{"id": f"doc{i}"} for i in range(docs)], vectors)
+    float_bytes = exact.matrix.nbytes
+    # Re-ranking reads from the memory-mapped copy, as the demo does
+    store_dir = tempfile.mkdtemp(prefix="rag-quantize-")
+    exact.save(store_dir)
+    stored = VectorIndex.load(store_dir)
+    print(f"\n📦 Quantized storage ({docs:,} x {dims} vectors, float32 = {float_bytes / 2**20:.1f} MiB)")
+    print(f"{'index':<14} {'rerank':>6} {'MiB':>7} {'smaller':>8} {'recall@10':>10}")
+    for name, build in (("int8", lambda: Int8Index.from_index(stored)),
+                        ("pq m=96", lambda: PQIndex.from_index(stored, m=96)),
+                        ("pq m=48", lambda: PQIndex.from_index(stored, m=48))):
+        index = build()
+        for rerank in (0, 50):
+            index.rerank = rerank
+            recall = recall_at_k(index, exact, queries, k=10)
+            size = index.memory_bytes()
+            print(f"{name:<14} {rerank:>6} {size / 2**20:>7.2f} {float_bytes / size:>7.1f}x {recall:>10.3f}")
@@ -0,0 +1,162 @@
+"""
+Semantic Response Cache for the RAG Pattern Demo
+================================================
+
+Users ask the same thing in different words ("What is Azure ML?" /
+"Tell me about Azure Machine Learning"). An exact-match cache misses
+those; this one compares the query's embedding with the embeddings of
+recently answered queries and, above a similarity threshold, returns
+the stored answer without retrieval or generation.
+
+- Lookup is one matrix-vector product over a preallocated matrix of
+  unit query vectors (no Python loop over entries)
+- Bounded: when full, the least recently used entry is overwritten
+- Every entry belongs to a knowledge-base version (e.g. the corpus
+  fingerprint); when the version changes the cache is cleared, so
+  answers never outlive the documents they were grounded in
+
+The threshold only means something for a particular embedder. The demo
+embeds with lexical feature hashing (hashing_embedder), which scores
+reworded questions that share their key terms at ~0.70-0.84 and
+different questions on the same topic up to ~0.70, so its default is
+0.72. Paraphrases with different vocabulary ("Azure ML" / "Azure
+Machine Learning") score ~0.3 there: hits on those need a semantic
+embedding model (e.g. an Azure OpenAI embeddings deployment), with the
+threshold recalibrated for it. Run this file for the calibration report.
+
+Prerequisites:
+    pip install numpy
+"""
+
+import threading
+import numpy as np
+from typing import Any, Dict, Optional
+
+from rag_index import normalize_rows
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache of query embedding -> stored value.
+
+    Args:
+        max_items: Entries kept before the least recently used is evicted
+        threshold: Minimum cosine similarity for a hit (1.0 = identical only);
+            calibrate it for the embedder in use (see the module docstring)
+    """
+
+    def __init__(self, max_items: int = 256, threshold: float = 0.72):
+        self.max_items = max_items
+        self.threshold = threshold
+        self.version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every entry (the matrix is re-allocated on the next store)."""
+        self._vectors = None  # max_items x dimensions, unit rows
+        self._values = [None] * self.max_items
+        self._last_used = np.zeros(self.max_items, dtype=np.int64)  # 0 = empty slot
+        self._clock = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _check_version(self, version: Any) -> None:
+        if version != self.version:
+            if self._size:
+                self.invalidations += 1
+            self.clear()
+            self.version = version
+
+    def lookup(self, query_vector, version: Any = None) -> Optional[Any]:
+        """Stored value of the most similar cached query, if similar enough."""
+        query = normalize_rows(query_vector).ravel()
+        with self._lock:
+            self._check_version(version)
+            if self._size:
+                scores = self._vectors @ query
+                scores[self._last_used == 0] = -np.inf
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._clock += 1
+                    self._last_used[best] = self._clock
+                    self.hits += 1
+                    return self._values[best]
+            self.misses += 1
+            return None
+
+    def store(self, query_vector, value: Any, version: Any = None) -> None:
+        """Remember value for this query, evicting the LRU entry if full."""
+        query = normalize_rows(query_vector).ravel()
+        with self._lock:
+            self._check_version(version)
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_items, len(query)), dtype=np.float32)
+            slot = int(np.argmin(self._last_used))  # an empty slot, else the LRU entry
+            if self._last_used[slot] == 0:
+                self._size += 1
+            self._clock += 1
+            self._vectors[slot] = query
+            self._values[slot] = value
+            self._last_used[slot] = self._clock
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+        }
+
+
+# Reworded questions that should share an answer, and different questions
+# on the same topic that must not (used to calibrate the threshold)
+PARAPHRASES = [
+    ("What is Azure Machine Learning?", "Tell me about Azure Machine Learning"),
+    ("What are the responsible AI principles?", "Which principles make up responsible AI?"),
+    ("How does Azure OpenAI handle security?", "How is security handled in Azure OpenAI?"),
+    ("What can Computer Vision do?", "What can Azure Computer Vision do"),
+    ("What is OCR used for in Azure?", "Azure OCR is used for what?"),
+    ("List the Azure AI services", "Which Azure AI services are there?"),
+    ("What frameworks does Azure Machine Learning support?",
+     "Which frameworks are supported by Azure Machine Learning?"),
+    ("Does Azure OpenAI support fine-tuning?", "Can I fine-tune models in Azure OpenAI?"),
+    ("What is Azure ML?", "Tell me about Azure Machine Learning"),
+]
+DIFFERENT_QUESTIONS = [
+    ("What is Azure OpenAI?", "What is Azure Machine Learning?"),
+    ("What can Computer Vision do?", "What can Custom Vision do?"),
+    ("How does Azure OpenAI handle security?", "How does Azure Machine Learning handle security?"),
+    ("What are the responsible AI principles?", "What are the Azure AI services?"),
+    ("Does Azure OpenAI support fine-tuning?", "Does Azure OpenAI support image creation?"),
+    ("What is OCR used for in Azure?", "What is spatial analysis used for in Azure?"),
+]
+
+
+if __name__ == "__main__":
+    from hashing_embedder import HashingEmbedder
+
+    embedder = HashingEmbedder()
+
+    def similarities(pairs):
+        vectors = embedder.embed([text for pair in pairs for text in pair])
+        return np.einsum("ij,ij->i", vectors[0::2], vectors[1::2])
+
+    paraphrase_scores = similarities(PARAPHRASES)
+    different_scores = similarities(DIFFERENT_QUESTIONS)
+    print("\n🎯 Semantic cache threshold calibration (hashing embedder)")
+    for label, pairs, scores in (("paraphrase", PARAPHRASES, paraphrase_scores),
+                                 ("different", DIFFERENT_QUESTIONS, different_scores)):
+        for (a, b), score in zip(pairs, scores):
+            print(f"{label:<11} {score:.3f}  {a} / {b}")
+    print(f"\n{'threshold':>9} {'paraphrase hits':>16} {'false hits':>11}")
+    for threshold in (0.6, 0.65, 0.7, 0.72, 0.75, 0.8, 0.9, 0.95):
+        print(f"{threshold:>9.2f} {int((paraphrase_scores >= threshold).sum()):>9} of {len(PARAPHRASES):<4} "
+              f"{int((different_scores >= threshold).sum()):>6} of {len(DIFFERENT_QUESTIONS)}")
@@ -0,0 +1,110 @@
+"""
+Token Budgeting for RAG Context Assembly
+========================================
+
+Pasting every retrieved document into the prompt makes each query
+slower and more expensive, and a long enough context overflows the
+model's window. This module counts tokens with tiktoken and packs the
+highest-scoring documents into a fixed context budget:
+
+- Documents are taken in ranking order while they fit
+- The first one that doesn't fit is truncated to the remaining budget
+  (if enough room is left to be useful), the rest are dropped
+- A report says how many tokens the budget saved
+
+The tiktoken encoder is loaded once per model and cached. If tiktoken
+is not installed (or its encoding files can't be downloaded) counts
+fall back to ~4 characters per token.
+
+Prerequisites:
+    pip install tiktoken
+"""
+
+import functools
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Encoding used when tiktoken doesn't recognise the model/deployment name
+DEFAULT_ENCODING = "o200k_base"
+# Don't bother truncating a document into fewer tokens than this
+MIN_TRUNCATED_TOKENS = 32
+
+
+@functools.lru_cache(maxsize=None)
+def get_encoder(model: str = ""):
+    """
+    Cached tiktoken encoding for model (deployment names that aren't
+    model names get DEFAULT_ENCODING). Returns None if tiktoken is
+    unavailable, in which case counts are approximate.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:  # encoding files are downloaded on first use
+        print(f"⚠️  tiktoken encoding unavailable ({type(e).__name__}); approximating token counts")
+        return None
+
+
+def count_tokens(text: str, model: str = "") -> int:
+    """Number of tokens text costs for model."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        return len(text) // 4 + 1
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "") -> str:
+    """The longest prefix of text that fits in max_tokens tokens."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        return text[:max(0, max_tokens - 1) * 4]
+    tokens = encoder.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoder.decode(tokens[:max_tokens])
+
+
+def pack_context(docs: Sequence[Dict], budget: int, model: str = "",
+                 format_doc: Callable[[Dict], str] = lambda doc: doc["content"],
+                 separator: str = "\n\n") -> Tuple[List[str], Dict[str, int]]:
+    """
+    Pack formatted documents (best first) into at most budget tokens.
+
+    Returns:
+        The context sections to join with separator, and a report with
+        tokens_available (all documents), tokens_used, tokens_saved and
+        docs_included / docs_truncated / docs_dropped
+    """
+    separator_tokens = count_tokens(separator, model) if separator else 0
+    sections = [format_doc(doc) for doc in docs]
+    costs = [count_tokens(section, model) for section in sections]
+    available = sum(costs) + separator_tokens * max(0, len(sections) - 1)
+
+    packed = []
+    used = truncated = 0
+    for section, cost in zip(sections, costs):
+        room = budget - used - (separator_tokens if packed else 0)
+        if cost <= room:
+            packed.append(section)
+        elif room >= MIN_TRUNCATED_TOKENS:
+            section = truncate_tokens(section, room, model)
+            cost = count_tokens(section, model)
+            packed.append(section)
+            truncated = 1
+        else:
+            break
+        used += cost + (separator_tokens if len(packed) > 1 else 0)
+        if truncated:
+            break
+
+    return packed, {
+        "tokens_available": available,
+        "tokens_used": used,
+        "tokens_saved": available - used,
+        "docs_included": len(packed),
+        "docs_truncated": truncated,
+        "docs_dropped": len(sections) - len(packed),
+    }
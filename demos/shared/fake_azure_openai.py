@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the Azure OpenAI REST API
+============================================
+
+A tiny HTTP server that answers the two endpoints the demos use, so
+they can be run, timed and compared without an Azure subscription:
+
+    POST /openai/deployments/{deployment}/chat/completions
+    POST /openai/deployments/{deployment}/embeddings
+
+Responses have the real wire format (including usage and SSE streaming),
+with simulated timing:
+
+- Chat: waits `latency` seconds (time to first token), then produces
+  `completion_tokens` tokens at `tokens_per_second`
+- Embeddings: waits `latency` seconds; vectors are deterministic (seeded
+  from the input text) unit vectors of `dimensions` floats
+
+The answers are placeholders - this measures the client side (batching,
+concurrency, caching, parsing), not model quality.
+
+Usage:
+    python fake_azure_openai.py --port 8765 --latency 0.2 --tokens-per-second 50
+    export AZURE_OPENAI_ENDPOINT=http://127.0.0.1:8765
+    export AZURE_OPENAI_KEY=anything
+
+    # or in-process
+    server = start_server(port=0, latency=0.05)
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH_PATTERN = re.compile(r"^/openai/deployments/([^/]+)/(chat/completions|embeddings)$")
+FILLER_WORDS = "this is a simulated answer from the local benchmark server".split()
+
+
+def approximate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+class FakeAzureOpenAIServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer carrying the simulated service settings.
+
+    Args:
+        latency: Seconds before the first token / the embeddings response
+        tokens_per_second: Generation speed after the first token
+        completion_tokens: Tokens per chat answer (capped by max_tokens)
+        dimensions: Embedding vector length
+    """
+
+    daemon_threads = True
+    request_queue_size = 128  # the default of 5 drops connects under concurrency
+
+    def __init__(self, address, latency: float = 0.2, tokens_per_second: float = 50.0,
+                 completion_tokens: int = 40, dimensions: int = 1536):
+        super().__init__(address, FakeAzureOpenAIHandler)
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.dimensions = dimensions
+        self.requests_served = 0
+        self._lock = threading.Lock()
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_served += 1
+
+
+class FakeAzureOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        match = PATH_PATTERN.match(self.path.split("?", 1)[0])
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not match:
+            self._send_json(404, {"error": {"code": "404", "message": "Resource not found"}})
+            return
+        self.server.count_request()
+        deployment, operation = match.groups()
+        if operation == "embeddings":
+            self._embeddings(deployment, request)
+        else:
+            self._chat(deployment, request)
+
+    def _embeddings(self, deployment: str, request) -> None:
+        inputs = request.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        time.sleep(self.server.latency)
+        data = []
+        for i, text in enumerate(inputs):
+            rng = random.Random(hashlib.sha256(str(text).encode("utf-8")).digest())
+            vector = [rng.gauss(0.0, 1.0) for _ in range(self.server.dimensions)]
+            norm = sum(v * v for v in vector) ** 0.5
+            data.append({"object": "embedding", "index": i, "embedding": [v / norm for v in vector]})
+        tokens = sum(approximate_tokens(str(text)) for text in inputs)
+        self._send_json(200, {"object": "list", "data": data, "model": deployment,
+                              "usage": {"prompt_tokens": tokens, "total_tokens": tokens}})
+
+    def _chat(self, deployment: str, request) -> None:
+        prompt_tokens = sum(approximate_tokens(str(m.get("content", "")))
+                            for m in request.get("messages", []))
+        count = min(self.server.completion_tokens, request.get("max_tokens") or self.server.completion_tokens)
+        words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(count)]
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": count,
+                 "total_tokens": prompt_tokens + count}
+        base = {"id": f"chatcmpl-{random.getrandbits(64):x}", "created": int(time.time()),
+                "model": deployment}
+
+        if not request.get("stream"):
+            time.sleep(self.server.latency + count / self.server.tokens_per_second)
+            self._send_json(200, dict(base, object="chat.completion", usage=usage, choices=[{
+                "index": 0, "finish_reason": "stop",
+                "message": {"role": "assistant", "content": " ".join(words)}}]))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(self.server.latency)
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            self._send_event(dict(base, object="chat.completion.chunk", choices=[
+                {"index": 0, "delta": delta, "finish_reason": None}]))
+            time.sleep(1.0 / self.server.tokens_per_second)
+        self._send_event(dict(base, object="chat.completion.chunk", choices=[
+            {"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (request.get("stream_options") or {}).get("include_usage"):
+            self._send_event(dict(base, object="chat.completion.chunk", choices=[], usage=usage))
+        self._send_chunk(b"data: [DONE]\n\n")
+        self._send_chunk(b"")
+
+    def _send_event(self, payload) -> None:
+        self._send_chunk(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_server(port: int = 0, host: str = "127.0.0.1", **settings) -> FakeAzureOpenAIServer:
+    """Start the server on a daemon thread (port 0 = any free port)."""
+    server = FakeAzureOpenAIServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Azure OpenAI REST API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--completion-tokens", type=int, default=40)
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding length")
+    args = parser.parse_args()
+
+    server = FakeAzureOpenAIServer(("127.0.0.1", args.port), latency=args.latency,
+                                   tokens_per_second=args.tokens_per_second,
+                                   completion_tokens=args.completion_tokens,
+                                   dimensions=args.dimensions)
+    print(f"🧪 Fake Azure OpenAI listening on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Local Stand-in for the Azure AI Document Intelligence REST API
+==============================================================
+
+A tiny HTTP server that answers the analyze operation the demos use, so
+client overhead (connections, polling, parsing) can be timed without an
+Azure resource:
+
+    POST /formrecognizer/documentModels/{model}:analyze
+         -> 202 Accepted, Operation-Location: .../analyzeResults/{id}
+    GET  /formrecognizer/documentModels/{model}/analyzeResults/{id}
+         -> {"status": "running"} until `latency` seconds have passed,
+            then {"status": "succeeded", "analyzeResult": {...}}
+
+Clients poll at their own polling_interval (no Retry-After is sent).
+The analyze result is a placeholder (one page, one document with an
+InvoiceTotal field) - this measures the client side, not extraction.
+
+Usage:
+    python fake_document_intelligence.py --port 8767 --latency 0.2
+    export AZURE_DOCUMENT_INTELLIGENCE_ENDPOINT=http://127.0.0.1:8767
+    export AZURE_DOCUMENT_INTELLIGENCE_KEY=anything
+
+    # or in-process
+    server = start_server(port=0, latency=0.05)
+    endpoint = f"http://127.0.0.1:{server.server_port}"
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANALYZE_PATTERN = re.compile(r"^/formrecognizer/documentModels/([^/:]+):analyze$")
+RESULT_PATTERN = re.compile(r"^/formrecognizer/documentModels/([^/:]+)/analyzeResults/([^/]+)$")
+
+
+def placeholder_result(model_id: str, api_version: str, document_bytes: int):
+    return {
+        "apiVersion": api_version,
+        "modelId": model_id,
+        "content": "INVOICE\nTotal $100.00",
+        "pages": [{"pageNumber": 1, "angle": 0, "width": 8.5, "height": 11, "unit": "inch",
+                   "spans": [{"offset": 0, "length": 21}], "words": [], "lines": []}],
+        "documents": [{
+            "docType": "invoice",
+            "confidence": 1.0,
+            "spans": [{"offset": 0, "length": 21}],
+            "fields": {"InvoiceTotal": {
+                "type": "currency", "content": "$100.00", "confidence": 1.0,
+                "valueCurrency": {"amount": 100.0, "currencySymbol": "$"}}},
+        }],
+        "styles": [],
+        "metadata": {"documentBytes": document_bytes},
+    }
+
+
+class FakeDocumentIntelligenceServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer carrying the simulated service settings.
+
+    Args:
+        latency: Seconds from submitting a document until its result is ready
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address, latency: float = 0.2):
+        super().__init__(address, FakeDocumentIntelligenceHandler)
+        self.latency = latency
+        self.requests_served = 0
+        self.connections_opened = 0
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        with self._lock:
+            self.connections_opened += 1
+        super().process_request(request, client_address)
+
+    def count_request(self) -> None:
+        with self._lock:
+            self.requests_served += 1
+
+    def submit(self, model_id: str, api_version: str, document_bytes: int) -> str:
+        operation_id = uuid.uuid4().hex
+        with self._lock:
+            self._operations[operation_id] = (time.monotonic() + self.latency,
+                                              placeholder_result(model_id, api_version, document_bytes))
+        return operation_id
+
+    def poll(self, operation_id: str):
+        """(ready, result) for an operation, or None if unknown; results are kept until fetched."""
+        with self._lock:
+            operation = self._operations.get(operation_id)
+            if operation is None:
+                return None
+            ready_at, result = operation
+            if time.monotonic() < ready_at:
+                return False, None
+            del self._operations[operation_id]
+            return True, result
+
+
+class FakeDocumentIntelligenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real service
+
+    def log_message(self, format, *args):
+        pass  # keep benchmark output clean
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self) -> None:
+        self._send_json(404, {"error": {"code": "NotFound", "message": "Resource not found"}})
+
+    def _api_version(self) -> str:
+        match = re.search(r"api-version=([^&]+)", self.path)
+        return match.group(1) if match else "2023-07-31"
+
+    def do_POST(self):
+        document = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = ANALYZE_PATTERN.match(self.path.split("?", 1)[0])
+        if not match:
+            self._not_found()
+            return
+        self.server.count_request()
+        model_id = match.group(1)
+        api_version = self._api_version()
+        operation_id = self.server.submit(model_id, api_version, len(document))
+        location = (f"http://{self.headers.get('Host')}/formrecognizer/documentModels/{model_id}"
+                    f"/analyzeResults/{operation_id}?api-version={api_version}")
+        self.send_response(202)
+        self.send_header("Operation-Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        match = RESULT_PATTERN.match(self.path.split("?", 1)[0])
+        state = self.server.poll(match.group(2)) if match else None
+        if state is None:
+            self._not_found()
+            return
+        self.server.count_request()
+        ready, result = state
+        if not ready:
+            self._send_json(200, {"status": "running"})
+            return
+        now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        self._send_json(200, {"status": "succeeded", "createdDateTime": now,
+                              "lastUpdatedDateTime": now, "analyzeResult": result})
+
+
+def start_server(port: int = 0, host: str = "127.0.0.1", **settings) -> FakeDocumentIntelligenceServer:
+    """Start the server on a daemon thread (port 0 = any free port)."""
+    server = FakeDocumentIntelligenceServer((host, port), **settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Document Intelligence REST API.")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds until a result is ready")
+    args = parser.parse_args()
+
+    server = FakeDocumentIntelligenceServer(("127.0.0.1", args.port), latency=args.latency)
+    print(f"🧪 Fake Document Intelligence listening on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Latency and Token Instrumentation for Model Calls
+=================================================
+
+A lightweight, in-process metrics layer for the demos' Azure OpenAI
+calls. Wrap a call with @instrumented and every invocation records:
+
+- Wall time (for streams: until the last chunk has been consumed)
+- Time to first token (streaming calls)
+- Prompt and completion tokens, from response.usage
+- Cache status (hit / miss / bypass) when the call goes through a cache;
+  a hit's usage is recorded as tokens saved, not as tokens spent
+- Success or error
+
+Values land in fixed-bucket histograms (Prometheus style), so memory
+stays constant no matter how many calls are made. Read them back with
+METRICS.summary() (a table with p50/p95 estimates) or
+METRICS.prometheus_text() (text exposition format), or serve the
+latter over HTTP with serve_metrics(port) for a Prometheus scrape.
+
+Usage:
+    from llm_metrics import METRICS, instrumented
+
+    chat_completion = instrumented("chat.completions")(client.chat.completions.create)
+    ...
+    print(METRICS.summary())
+
+Configuration (environment variables):
+    LLM_METRICS_PORT - if set, demos serve /metrics on this port
+"""
+
+import bisect
+import functools
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384, 65536)
+
+# Metric name -> (help text, buckets)
+HISTOGRAMS = {
+    "llm_request_duration_seconds": ("Wall time of model calls", LATENCY_BUCKETS),
+    "llm_time_to_first_token_seconds": ("Time to first streamed token", LATENCY_BUCKETS),
+    "llm_prompt_tokens": ("Prompt tokens per call (response.usage)", TOKEN_BUCKETS),
+    "llm_completion_tokens": ("Completion tokens per call (response.usage)", TOKEN_BUCKETS),
+    "llm_saved_tokens": ("Prompt + completion tokens of calls served from a cache", TOKEN_BUCKETS),
+}
+REQUESTS_TOTAL = "llm_requests_total"
+
+
+class Histogram:
+    """Fixed-bucket histogram: per-bucket counts plus sum and count."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last bucket is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating within its bucket (clamped
+        to the observed min/max, which also covers the +Inf bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = max(self.min, self.buckets[i - 1] if i > 0 else self.min)
+                upper = min(self.max, self.buckets[i] if i < len(self.buckets) else self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{key}="{value}"' for key, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Labels, int] = {}
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def count_request(self, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def record_call(self, operation: str, deployment: str, seconds: float,
+                    ttft: Optional[float] = None, usage: Any = None,
+                    cache: str = "none", status: str = "ok") -> None:
+        """
+        Record one model call (usage is a response.usage object or None).
+        Cache hits cost no tokens: the stored response's usage goes into
+        llm_saved_tokens, so the spent-token histograms only hold calls
+        that reached the model.
+        """
+        labels = {"operation": operation, "deployment": deployment}
+        self.count_request(cache=cache, status=status, **labels)
+        self.observe("llm_request_duration_seconds", seconds, cache=cache, **labels)
+        if ttft is not None:
+            self.observe("llm_time_to_first_token_seconds", ttft, **labels)
+        if cache == "hit":
+            saved = getattr(usage, "total_tokens", None)
+            if saved is not None:
+                self.observe("llm_saved_tokens", saved, **labels)
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if prompt_tokens is not None:
+            self.observe("llm_prompt_tokens", prompt_tokens, **labels)
+        if completion_tokens is not None:
+            self.observe("llm_completion_tokens", completion_tokens, **labels)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def summary(self) -> str:
+        """Human-readable table: count, mean, p50, p95 per metric and labels."""
+        with self._lock:
+            rows = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = [f"{'metric':<32} {'labels':<72} {'count':>6} {'mean':>9} {'p50':>9} {'p95':>9}"]
+        for (name, labels), h in rows:
+            label_text = ",".join(f"{k}={v}" for k, v in labels)
+            lines.append(f"{name:<32} {label_text:<72} {h.count:>6} {h.sum / h.count:>9.3f} "
+                         f"{h.quantile(0.5):>9.3f} {h.quantile(0.95):>9.3f}")
+        for labels, count in counters:
+            label_text = ",".join(f"{k}={v}" for k, v in labels)
+            lines.append(f"{REQUESTS_TOTAL:<32} {label_text:<72} {count:>6}")
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        lines = []
+        for name, (help_text, _) in HISTOGRAMS.items():
+            series = [(labels, h) for (metric, labels), h in histograms if metric == name]
+            if not series:
+                continue
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for labels, h in series:
+                cumulative = 0
+                for bound, count in zip(h.buckets + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(float(bound))
+                    bucket_labels = _format_labels(labels, 'le="%s"' % le)
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {h.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {h.count}")
+        if counters:
+            lines += [f"# HELP {REQUESTS_TOTAL} Model calls by outcome and cache status",
+                      f"# TYPE {REQUESTS_TOTAL} counter"]
+            lines += [f"{REQUESTS_TOTAL}{_format_labels(labels)} {count}" for labels, count in counters]
+        return "\n".join(lines) + "\n"
+
+
+# The process-wide registry the demos record into
+METRICS = MetricsRegistry()
+
+
+def _timed_stream(stream: Iterator, start: float, record: Callable[..., None]) -> Iterator:
+    """Pass chunks through, noting the first content token and the end."""
+    ttft = None
+    usage = None
+    status = "error"
+    try:
+        for chunk in stream:
+            if ttft is None and any(getattr(c.delta, "content", None) for c in chunk.choices or ()):
+                ttft = time.perf_counter() - start
+            usage = getattr(chunk, "usage", None) or usage  # only with include_usage
+            yield chunk
+        status = "ok"
+    finally:
+        record(time.perf_counter() - start, ttft=ttft, usage=usage, status=status)
+
+
+def instrumented(operation: str, cache_status: Optional[Callable[[], Optional[str]]] = None,
+                 deployment: str = "", registry: MetricsRegistry = METRICS) -> Callable:
+    """
+    Decorator recording every call of a model-call function.
+
+    Args:
+        operation: Label for the call type (e.g. "chat.completions")
+        cache_status: Returns "hit"/"miss"/"bypass" for the call just
+            made (e.g. PromptCache.last_status); None = uncached
+        deployment: Label used when the call has no model= parameter
+    """
+    def decorate(create_fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(create_fn)
+        def call(*args, **params):
+            model = str(params.get("model", deployment))
+
+            def record(seconds, ttft=None, usage=None, status="ok"):
+                cache = (cache_status() if cache_status else None) or "none"
+                registry.record_call(operation, model, seconds, ttft=ttft,
+                                     usage=usage, cache=cache, status=status)
+
+            start = time.perf_counter()
+            try:
+                response = create_fn(*args, **params)
+            except Exception:
+                record(time.perf_counter() - start, status="error")
+                raise
+            if params.get("stream"):
+                return _timed_stream(response, start, record)
+            record(time.perf_counter() - start, usage=getattr(response, "usage", None))
+            return response
+
+        return call
+
+    return decorate
+
+
+def instrumented_async(operation: str, cache_status: Optional[Callable[[], Optional[str]]] = None,
+                       deployment: str = "", registry: MetricsRegistry = METRICS) -> Callable:
+    """Async version of instrumented() (non-streaming calls)."""
+    def decorate(create_fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(create_fn)
+        async def call(*args, **params):
+            model = str(params.get("model", deployment))
+            start = time.perf_counter()
+            status, usage = "error", None
+            try:
+                response = await create_fn(*args, **params)
+                status, usage = "ok", getattr(response, "usage", None)
+                return response
+            finally:
+                cache = (cache_status() if cache_status else None) or "none"
+                registry.record_call(operation, model, time.perf_counter() - start,
+                                     usage=usage, cache=cache, status=status)
+
+        return call
+
+    return decorate
+
+
+def serve_metrics(port: int, registry: MetricsRegistry = METRICS) -> ThreadingHTTPServer:
+    """Serve registry.prometheus_text() at http://localhost:<port>/metrics (daemon thread)."""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # keep the demo output clean
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,372 @@
+"""
+Shared Azure Service Clients for the Demos
+==========================================
+
+Every demo used to build its own client: an AzureOpenAI at import, a new
+DocumentAnalysisClient per document, a bare requests.post per
+translation. Under load that means new TLS connections per call and,
+when the quota runs out, every caller retrying at once (a retry storm).
+
+This module gives all demos one layer that:
+- Shares one client per configuration (so HTTP connections are pooled
+  and reused across calls, modules and threads): Azure OpenAI, Document
+  Intelligence, Language (Text Analytics), Computer Vision, Content
+  Moderator, and a requests.Session for plain REST calls and downloads
+- Throttles Azure OpenAI calls with token buckets sized to the
+  deployment's requests-per-minute (RPM) and tokens-per-minute (TPM)
+  quota, so bursts are smoothed before they hit the service
+- Retries 429/5xx/connection errors with exponential backoff and full
+  jitter, honouring the service's Retry-After header when present
+
+Usage:
+    sys.path.insert(0, "<repo>/demos/shared")
+    from service_clients import get_openai_client, throttled
+
+    client = get_openai_client(ENDPOINT, KEY, API_VERSION)
+    chat_completion = throttled(client.chat.completions.create)
+    response = chat_completion(model=DEPLOYMENT, messages=[...])
+
+Configuration (environment variables):
+    AZURE_OPENAI_TPM - tokens-per-minute quota of the deployment (default 30000)
+    AZURE_OPENAI_RPM - requests-per-minute quota (default 6 per 1000 TPM)
+    AZURE_HTTP_POOL_SIZE - keep-alive connections per host (default 32)
+    AZURE_HTTP_CONNECT_TIMEOUT - seconds to establish a connection (default 10)
+    AZURE_HTTP_READ_TIMEOUT - seconds to wait for response data (default 120)
+
+Prerequisites:
+    pip install openai requests
+    Each service's SDK only for its client: azure-ai-formrecognizer,
+    azure-ai-textanalytics, azure-cognitiveservices-vision-computervision,
+    azure-cognitiveservices-vision-contentmoderator
+"""
+
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+OPENAI_TPM = int(os.getenv("AZURE_OPENAI_TPM", "30000"))
+OPENAI_RPM = int(os.getenv("AZURE_OPENAI_RPM", str(max(1, OPENAI_TPM * 6 // 1000))))
+
+# Connection pool size and timeouts for shared HTTP sessions
+POOL_SIZE = int(os.getenv("AZURE_HTTP_POOL_SIZE", "32"))
+CONNECT_TIMEOUT_SECONDS = float(os.getenv("AZURE_HTTP_CONNECT_TIMEOUT", "10"))
+READ_TIMEOUT_SECONDS = float(os.getenv("AZURE_HTTP_READ_TIMEOUT", "120"))
+# Retry schedule for throttled calls
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    The bucket holds at most `capacity` tokens (default: 10 seconds of
+    quota, since Azure evaluates quotas over short windows). A caller
+    reserves tokens up front and sleeps off any deficit, so concurrent
+    callers queue fairly instead of all firing at once.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1.0, rate_per_minute / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take amount tokens (possibly into debt); return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            return max(0.0, -self.tokens / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Give back tokens that were reserved but not used."""
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def acquire(self, amount: float = 1.0) -> None:
+        time.sleep(self.reserve(amount))
+
+    async def acquire_async(self, amount: float = 1.0) -> None:
+        await asyncio.sleep(self.reserve(amount))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one deployment."""
+
+    def __init__(self, rpm: int = OPENAI_RPM, tpm: int = OPENAI_TPM):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def _wait(self, tokens: int) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def acquire(self, tokens: int) -> None:
+        time.sleep(self._wait(tokens))
+
+    async def acquire_async(self, tokens: int) -> None:
+        await asyncio.sleep(self._wait(tokens))
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Refund the difference once the response reports real usage."""
+        if actual is not None and actual < estimated:
+            self.tokens.refund(estimated - actual)
+
+
+def estimate_request_tokens(params: Dict[str, Any]) -> int:
+    """
+    Tokens a request counts against the TPM quota: prompt size (about 4
+    characters per token) plus max_tokens, which Azure reserves up front.
+    """
+    prompt = params.get("messages") or params.get("input") or ""
+    if isinstance(prompt, list):
+        prompt = " ".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in prompt)
+    return len(str(prompt)) // 4 + 1 + int(params.get("max_tokens") or 0)
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    return getattr(exc, "status_code", None)
+
+
+def _is_retryable(exc: Exception) -> bool:
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRY_STATUSES
+    try:
+        import openai
+    except ImportError:
+        return False
+    return isinstance(exc, openai.APIConnectionError)  # includes timeouts
+
+
+def retry_delay(attempt: int, exc: Optional[Exception] = None) -> float:
+    """
+    Seconds to wait before retry number `attempt` (1-based).
+    Uses the server's Retry-After(-ms) header when present, otherwise
+    exponential backoff with full jitter so clients spread out.
+    """
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value:
+            try:
+                return min(BACKOFF_MAX_SECONDS, float(value) * scale) + random.uniform(0, 0.25)
+            except ValueError:
+                pass  # an HTTP date; fall back to backoff
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_limiter(deployment: str = "") -> RateLimiter:
+    """One shared rate limiter per deployment (each has its own quota)."""
+    return RateLimiter()
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+def throttled(create_fn: Callable[..., Any], limiter: Optional[RateLimiter] = None,
+              max_attempts: int = MAX_ATTEMPTS) -> Callable[..., Any]:
+    """
+    Wrap an Azure OpenAI create function (chat.completions.create,
+    embeddings.create) with quota throttling and 429-aware retries.
+    """
+    def call(**params):
+        active = limiter or get_openai_limiter(str(params.get("model", "")))
+        estimated = estimate_request_tokens(params)
+        for attempt in range(1, max_attempts + 1):
+            active.acquire(estimated)
+            try:
+                response = create_fn(**params)
+            except Exception as exc:
+                # A failed attempt used no quota: refund its reservation so
+                # retries don't charge the token bucket again and again
+                active.settle(estimated, 0)
+                if attempt == max_attempts or not _is_retryable(exc):
+                    raise
+                time.sleep(retry_delay(attempt, exc))
+                continue
+            active.settle(estimated, _usage_tokens(response))
+            return response
+
+    return call
+
+
+def throttled_async(create_fn: Callable[..., Any], limiter: Optional[RateLimiter] = None,
+                    max_attempts: int = MAX_ATTEMPTS) -> Callable[..., Any]:
+    """Async version of throttled() for AsyncAzureOpenAI create functions."""
+    async def call(**params):
+        active = limiter or get_openai_limiter(str(params.get("model", "")))
+        estimated = estimate_request_tokens(params)
+        for attempt in range(1, max_attempts + 1):
+            await active.acquire_async(estimated)
+            try:
+                response = await create_fn(**params)
+            except Exception as exc:
+                # A failed attempt used no quota: refund its reservation so
+                # retries don't charge the token bucket again and again
+                active.settle(estimated, 0)
+                if attempt == max_attempts or not _is_retryable(exc):
+                    raise
+                await asyncio.sleep(retry_delay(attempt, exc))
+                continue
+            active.settle(estimated, _usage_tokens(response))
+            return response
+
+    return call
+
+
+@functools.lru_cache(maxsize=None)
+def get_openai_client(endpoint: str, api_key: str, api_version: str):
+    """
+    Shared AzureOpenAI client (one connection pool) per configuration.
+    SDK retries are off because throttled() owns retry/backoff.
+    """
+    from openai import AzureOpenAI
+    return AzureOpenAI(api_key=api_key, api_version=api_version,
+                       azure_endpoint=endpoint, max_retries=0)
+
+
+@functools.lru_cache(maxsize=None)
+def get_async_openai_client(endpoint: str, api_key: str, api_version: str):
+    """Shared AsyncAzureOpenAI client per configuration (see get_openai_client)."""
+    from openai import AsyncAzureOpenAI
+    return AsyncAzureOpenAI(api_key=api_key, api_version=api_version,
+                            azure_endpoint=endpoint, max_retries=0)
+
+
+def _pooled_session(retries: bool, pool_size: int = POOL_SIZE):
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    max_retries = 0
+    if retries:
+        max_retries = Retry(
+            total=MAX_ATTEMPTS - 1,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # the Azure AI REST APIs are POSTs
+            backoff_factor=BACKOFF_BASE_SECONDS,
+            backoff_max=BACKOFF_MAX_SECONDS,
+            backoff_jitter=BACKOFF_BASE_SECONDS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=max_retries)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@functools.lru_cache(maxsize=None)
+def get_http_session():
+    """
+    Shared requests.Session for plain REST calls (e.g. Translator):
+    pooled keep-alive connections, retries with jittered backoff that
+    honour Retry-After on 429.
+    """
+    return _pooled_session(retries=True)
+
+
+def _azure_core_options(pool_size: int = POOL_SIZE,
+                        connect_timeout: float = CONNECT_TIMEOUT_SECONDS,
+                        read_timeout: float = READ_TIMEOUT_SECONDS) -> Dict[str, Any]:
+    """Pooled transport and jittered retry policy for an azure-core client."""
+    from azure.core.pipeline.policies import RetryPolicy
+    from azure.core.pipeline.transport import RequestsTransport
+
+    class JitteredRetryPolicy(RetryPolicy):
+        def get_backoff_time(self, settings):
+            return random.uniform(0, super().get_backoff_time(settings))
+
+    return {
+        "transport": RequestsTransport(session=_pooled_session(retries=False, pool_size=pool_size),
+                                       session_owner=False,
+                                       connection_timeout=connect_timeout,
+                                       read_timeout=read_timeout),
+        "retry_policy": JitteredRetryPolicy(retry_total=MAX_ATTEMPTS - 1,
+                                            retry_backoff_factor=BACKOFF_BASE_SECONDS,
+                                            retry_backoff_max=BACKOFF_MAX_SECONDS),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def get_document_analysis_client(endpoint: str, key: str, pool_size: int = POOL_SIZE,
+                                 connect_timeout: float = CONNECT_TIMEOUT_SECONDS,
+                                 read_timeout: float = READ_TIMEOUT_SECONDS):
+    """
+    Shared DocumentAnalysisClient per endpoint, on a pooled transport.
+    azure-core's retry policy (with added jitter) handles 429/5xx and
+    honours Retry-After; the client is safe to share across threads.
+
+    Args:
+        pool_size: Keep-alive connections kept open to the endpoint (size
+            it to the number of threads analyzing documents at once)
+        connect_timeout: Seconds to establish a connection
+        read_timeout: Seconds to wait for data on an open connection
+    """
+    from azure.ai.formrecognizer import DocumentAnalysisClient
+    from azure.core.credentials import AzureKeyCredential
+
+    return DocumentAnalysisClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(key),
+        **_azure_core_options(pool_size, connect_timeout, read_timeout),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_text_analytics_client(endpoint: str, key: str):
+    """Shared TextAnalyticsClient per endpoint (see get_document_analysis_client)."""
+    from azure.ai.textanalytics import TextAnalyticsClient
+    from azure.core.credentials import AzureKeyCredential
+
+    return TextAnalyticsClient(endpoint=endpoint, credential=AzureKeyCredential(key),
+                               **_azure_core_options())
+
+
+def _shared_msrest_client(client):
+    """
+    Configure an msrest-based (azure-cognitiveservices-*) client for
+    sharing: the same retry schedule and timeouts as the other clients,
+    and keep-alive, without which msrest closes its session after every
+    call. (msrest's urllib3 retries honour Retry-After on 429.)
+    """
+    retry_policy = client.config.retry_policy
+    retry_policy.retries = MAX_ATTEMPTS - 1
+    retry_policy.backoff_factor = BACKOFF_BASE_SECONDS
+    retry_policy.max_backoff = BACKOFF_MAX_SECONDS
+    client.config.connection.timeout = (CONNECT_TIMEOUT_SECONDS, READ_TIMEOUT_SECONDS)
+    client.config.keep_alive = True
+    return client
+
+
+@functools.lru_cache(maxsize=None)
+def get_computer_vision_client(endpoint: str, key: str):
+    """Shared ComputerVisionClient per endpoint, kept alive between calls."""
+    from azure.cognitiveservices.vision.computervision import ComputerVisionClient
+    from msrest.authentication import CognitiveServicesCredentials
+
+    return _shared_msrest_client(ComputerVisionClient(endpoint, CognitiveServicesCredentials(key)))
+
+
+@functools.lru_cache(maxsize=None)
+def get_content_moderator_client(endpoint: str, key: str):
+    """Shared ContentModeratorClient per endpoint, kept alive between calls."""
+    from azure.cognitiveservices.vision.contentmoderator import ContentModeratorClient
+    from msrest.authentication import CognitiveServicesCredentials
+
+    return _shared_msrest_client(ContentModeratorClient(endpoint, CognitiveServicesCredentials(key)))
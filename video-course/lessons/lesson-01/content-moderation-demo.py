@@ -10,19 +10,19 @@ Requirements:
 """
 
 import os
-from azure.ai.contentmoderator import ContentModeratorClient
-from azure.core.credentials import AzureKeyCredential
-from msrest.authentication import CognitiveServicesCredentials
-import requests
+import sys
 from PIL import Image, ImageDraw
 
+# Shared service clients (pooled connections, 429-aware retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "demos", "shared"))
+from service_clients import get_content_moderator_client, get_http_session
+
 # Add your Content Moderator key and endpoint
 content_moderator_key = "YOUR_CONTENT_MODERATOR_KEY"
 content_moderator_endpoint = "YOUR_CONTENT_MODERATOR_ENDPOINT"
 
 # Create client
-client = ContentModeratorClient(endpoint=content_moderator_endpoint, 
-                               credentials=CognitiveServicesCredentials(content_moderator_key))
+client = get_content_moderator_client(content_moderator_endpoint, content_moderator_key)
 
 # ------ Text Moderation Example ------
 def moderate_text():
@@ -60,7 +60,7 @@ def moderate_image(image_url):
     print("\n=== Image Moderation Example ===")
     
     # Download the image to analyze
-    image_data = requests.get(image_url).content
+    image_data = get_http_session().get(image_url).content
     
     # Evaluate for adult/racy content
     evaluation = client.image_moderation.evaluate_for_adult_racy_content_with_http_info(
@@ -14,11 +14,13 @@ Requirements:
 """
 
 import os
-import requests
+import sys
 import uuid
 import json
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.textanalytics import TextAnalyticsClient
+
+# Shared service clients (pooled connections, 429-aware retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "demos", "shared"))
+from service_clients import get_http_session, get_text_analytics_client
 
 # Add your Language service key and endpoint
 language_key = "YOUR_LANGUAGE_KEY"
@@ -30,10 +32,7 @@ translator_endpoint = "YOUR_TRANSLATOR_ENDPOINT"
 translator_location = "YOUR_TRANSLATOR_LOCATION"  # e.g., "eastus"
 
 # Initialize the Language client
-text_analytics_client = TextAnalyticsClient(
-    endpoint=language_endpoint, 
-    credential=AzureKeyCredential(language_key)
-)
+text_analytics_client = get_text_analytics_client(language_endpoint, language_key)
 
 # ------ Sentiment Analysis Example ------
 def analyze_sentiment(documents):
@@ -127,8 +126,8 @@ def translate_text(text, target_language):
         'text': text
     }]
     
-    # Make the request
-    response = requests.post(endpoint, params=params, headers=headers, json=body)
+    # Make the request (shared pooled session, retries on 429 with Retry-After)
+    response = get_http_session().post(endpoint, params=params, headers=headers, json=body)
     result = response.json()
     
     # Print the result
@@ -12,16 +12,18 @@ Requirements:
 """
 
 import os
+import sys
 import time
 import io
 from PIL import Image, ImageDraw, ImageFont
-import requests
-from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import (
     VisualFeatureTypes,
     Details,
 )
-from msrest.authentication import CognitiveServicesCredentials
+
+# Shared service clients (pooled connections, 429-aware retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "demos", "shared"))
+from service_clients import get_computer_vision_client, get_http_session
 
 # Add your Computer Vision subscription key and endpoint
 import os
@@ -30,9 +32,7 @@ vision_key = os.getenv("TWAI900COMPUTERVISION1_KEY")
 vision_endpoint = os.getenv("TWAI900COMPUTERVISION1_ENDPOINT")
 
 # Initialize the client
-vision_client = ComputerVisionClient(
-    vision_endpoint, CognitiveServicesCredentials(vision_key)
-)
+vision_client = get_computer_vision_client(vision_endpoint, vision_key)
 
 
 def analyze_image(image_url, features):
@@ -68,7 +68,7 @@ def recognize_text(image_url):
 def draw_bounding_boxes(image_url, objects):
     """Draw bounding boxes around detected objects"""
     # Download the image
-    response = requests.get(image_url)
+    response = get_http_session().get(image_url)
     img = Image.open(io.BytesIO(response.content))
 
     # Create a drawing context
@@ -14,11 +14,13 @@ Requirements:
 """
 
 import os
-import requests
+import sys
 import uuid
 import json
-from azure.core.credentials import AzureKeyCredential
-from azure.ai.textanalytics import TextAnalyticsClient
+
+# Shared service clients (pooled connections, 429-aware retries) live in demos/shared
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "demos", "shared"))
+from service_clients import get_http_session, get_text_analytics_client
 
 # Add your Language service key and endpoint
 import os
@@ -32,9 +34,7 @@ translator_endpoint = os.getenv("TWAI900TRANSLATOR1_ENDPOINT")
 translator_location = "eastus"  # Update if needed
 
 # Initialize the Language client
-text_analytics_client = TextAnalyticsClient(
-    endpoint=language_endpoint, credential=AzureKeyCredential(language_key)
-)
+text_analytics_client = get_text_analytics_client(language_endpoint, language_key)
 
 
 # ------ Sentiment Analysis Example ------
@@ -136,8 +136,8 @@ def translate_text(text, target_language):
     # Set up the request body
     body = [{"text": text}]
 
-    # Make the request
-    response = requests.post(endpoint, params=params, headers=headers, json=body)
+    # Make the request (shared pooled session, retries on 429 with Retry-After)
+    response = get_http_session().post(endpoint, params=params, headers=headers, json=body)
     result = response.json()
 
     # Print the result